@@ -21,7 +21,7 @@ from .services import (
     get_organiser_by_id,
     update_organiser_data,
 )
-from .utils import auth_backend, fastapi_users
+from .utils import auth_backend, fastapi_users, stream_fastapi_users
 
 admins_app = FastAPI(title="Admins API", version="0.1.0")
 
@@ -38,6 +38,8 @@ admins_app.include_router(register_router, prefix="/auth", tags=["Authentication
 admins_app.include_router(verify_router, prefix="", tags=["Authentication"])
 admins_app.include_router(users_router, prefix="", tags=["Admin"])
 get_current_active_user = fastapi_users.current_user(active=True, verified=True)
+# Also accepts ?access_token= for EventSource clients, see QueryTokenTransport.
+get_current_stream_user = stream_fastapi_users.current_user(active=True, verified=True)
 
 
 @admins_app.post("/new-admin", tags=["Organisation"], response_model=AdminsRead)
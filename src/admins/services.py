@@ -1,6 +1,8 @@
 from typing import Optional
 
 from config import get_logger
+from events.cache import event_catalog_cache
+from events.services import refresh_organiser_events_search_text
 from fastapi import HTTPException
 from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy import func, or_, select
@@ -64,6 +66,10 @@ async def update_organiser_data(
         setattr(organiser, key, value)
 
     await session.commit()
+    await refresh_organiser_events_search_text(
+        session=session, organiser_id=organiser.id, organiser_name=organiser.name
+    )
+    event_catalog_cache.clear()
     return organiser
 
 
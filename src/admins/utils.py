@@ -4,6 +4,7 @@ from typing import Union
 
 from config import get_logger, get_settings
 from database import get_async_session
+from fastapi.security import APIKeyQuery
 from fastapi_users import FastAPIUsers
 from fastapi_users.authentication import (
     AuthenticationBackend,
@@ -91,3 +92,26 @@ auth_backend = AuthenticationBackend(
 )
 
 fastapi_users = FastAPIUsers[Admins, uuid.UUID](get_user_manager, [auth_backend])
+
+
+class QueryTokenTransport(BearerTransport):
+    """Bearer token read from the ``access_token`` query parameter.
+
+    Only for endpoints opened by clients that cannot set an Authorization
+    header, such as a browser ``EventSource``.
+    """
+
+    def __init__(self, tokenUrl: str):
+        super().__init__(tokenUrl=tokenUrl)
+        self.scheme = APIKeyQuery(name="access_token", auto_error=False)
+
+
+query_auth_backend = AuthenticationBackend(
+    name="jwt-query",
+    transport=QueryTokenTransport(tokenUrl="/admins/auth/login"),
+    get_strategy=get_jwt_strategy,
+)
+
+stream_fastapi_users = FastAPIUsers[Admins, uuid.UUID](
+    get_user_manager, [auth_backend, query_auth_backend]
+)
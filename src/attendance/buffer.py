@@ -0,0 +1,169 @@
+import asyncio
+import uuid
+from typing import List, Optional, Tuple
+
+from config import get_logger, get_settings
+from database import async_session_maker
+from fastapi import HTTPException
+from notifications.services import enqueue_sms, sms_dispatcher
+from sqlalchemy import select, tuple_
+
+from .counters import attendance_counters
+from .models import EventAttendance
+from .schemas import EventAttendanceCreate
+from .services import build_attendance_row, insert_ignoring_duplicates
+
+logger = get_logger()
+settings = get_settings()
+
+PendingRsvp = Tuple[str, EventAttendanceCreate, Optional[str], asyncio.Future]
+
+
+class AttendanceWriteBuffer:
+    """Group-commit buffer for RSVP surges.
+
+    Requests queue their validated payload and wait on a future. A single
+    worker drains the queue every ``batch_size`` rows or ``interval`` seconds,
+    writes the batch with one multi-row INSERT and one commit, and resolves
+    each future with that request's ``(attendee, created)`` pair. The SMS of
+    newly created attendees are queued in the outbox in the same commit.
+    """
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.worker is not None:
+            await self.queue.put(None)
+            await self.worker
+            self.worker = None
+
+    async def submit(
+        self,
+        event_id: str,
+        data: EventAttendanceCreate,
+        sms_message: Optional[str] = None,
+    ) -> Tuple[EventAttendance, bool]:
+        try:
+            # Results are matched on the canonical id, whatever the path spelled.
+            event_id = str(uuid.UUID(str(event_id)))
+        except ValueError:
+            raise HTTPException(500, detail="Something went wrong")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((event_id, data, sms_message, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch: List[PendingRsvp] = [item]
+            deadline = loop.time() + self.interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self.flush(batch)
+            except Exception:
+                # Keep draining the queue, or every later RSVP would wait forever.
+                logger.error("Unable to resolve RSVP batch", exc_info=True)
+                self.fail(batch)
+
+    @staticmethod
+    def fail(batch: List[PendingRsvp]):
+        for _, _, _, future in batch:
+            if not future.done():
+                future.set_exception(HTTPException(500, detail="Something went wrong"))
+
+    async def flush(self, batch: List[PendingRsvp]):
+        try:
+            rows = [
+                build_attendance_row(event_id=event_id, data=data)
+                for event_id, data, _, _ in batch
+            ]
+            async with async_session_maker() as session:
+                await session.execute(insert_ignoring_duplicates(), rows)
+                db_results = await session.execute(
+                    select(EventAttendance).where(
+                        tuple_(EventAttendance.event_id, EventAttendance.email).in_(
+                            [(row["event_id"], row["email"]) for row in rows]
+                        )
+                    )
+                )
+                results = self.match(batch, rows, db_results.scalars().all())
+                queued = 0
+                for (_, _, sms_message, _), (attendee, created) in zip(
+                    batch, results
+                ):
+                    if created and sms_message:
+                        queued += await enqueue_sms(
+                            session=session,
+                            phone_numbers=[attendee.phone_number],
+                            message=sms_message,
+                        )
+                await session.commit()
+        except Exception:
+            logger.error("Unable to flush RSVP batch", exc_info=True)
+            self.fail(batch)
+            return
+
+        if queued:
+            sms_dispatcher.notify()
+        for (event_id, _, _, future), (attendee, created) in zip(batch, results):
+            if future.done():
+                continue
+            if attendee is None:
+                future.set_exception(HTTPException(500, detail="Something went wrong"))
+                continue
+            if created:
+                attendance_counters.added(event_id, [attendee.present])
+            future.set_result((attendee, created))
+
+    @staticmethod
+    def match(
+        batch: List[PendingRsvp], rows: List[dict], attendees: List[EventAttendance]
+    ) -> List[Tuple[Optional[EventAttendance], bool]]:
+        """Pair every request of the batch with its stored attendee."""
+        # MySQL compares emails case-insensitively, so the stored row may
+        # differ in case from the payload.
+        stored = {}
+        stored_ignoring_case = {}
+        for attendee in attendees:
+            event_id = str(attendee.event_id)
+            stored[(event_id, attendee.email)] = attendee
+            stored_ignoring_case[(event_id, attendee.email.lower())] = attendee
+
+        results = []
+        for row, (event_id, data, _, _) in zip(rows, batch):
+            attendee = stored.get((event_id, data.email)) or stored_ignoring_case.get(
+                (event_id, data.email.lower())
+            )
+            created = attendee is not None and attendee.id == row["id"]
+            results.append((attendee, created))
+        return results
+
+
+rsvp_buffer = AttendanceWriteBuffer(
+    batch_size=settings.rsvp_batch_size,
+    interval=settings.rsvp_batch_interval_ms / 1000,
+)
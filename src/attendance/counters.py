@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from config import get_logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils import count_where
+
+from .models import AttendanceModel, EventAttendance, EventAttendanceArchive
+from .schemas import AttendanceCount
+
+logger = get_logger()
+
+
+def event_key(event_id) -> str:
+    """Canonical counter key, so every spelling of an event id shares one entry."""
+    try:
+        return str(uuid.UUID(str(event_id)))
+    except ValueError:
+        return str(event_id)
+
+
+def count_statement(model: AttendanceModel = EventAttendance):
+    return select(
+        model.event_id,
+        func.count().label("total"),
+        count_where(model.present == True).label("present"),
+        count_where(model.present == False).label("absent"),
+    ).group_by(model.event_id)
+
+
+class AttendanceCounters:
+    """In-process total/present/absent counters per event.
+
+    The counters are seeded from the database on startup and then kept up to
+    date by the attendance services after each commit. Every change is pushed
+    to the queues of the live dashboards subscribed to that event.
+
+    The counts are per process. When the app runs with several workers, each
+    worker only sees the writes it handled itself.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, AttendanceCount] = {}
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self.seeded = False
+
+    async def seed(self, session: AsyncSession):
+        self.counts = {}
+        for model in (EventAttendance, EventAttendanceArchive):
+            db_results = await session.execute(count_statement(model))
+            for row in db_results.all():
+                self.counts[event_key(row.event_id)] = AttendanceCount(
+                    total=row.total, present=row.present, absent=row.absent
+                )
+        self.seeded = True
+        logger.info(f"Seeded attendance counters for {len(self.counts)} events")
+
+    async def get(self, session: AsyncSession, event_id: str) -> AttendanceCount:
+        event_id = event_key(event_id)
+        if event_id not in self.counts:
+            if self.seeded:
+                self.counts[event_id] = AttendanceCount()
+            else:
+                counts = AttendanceCount()
+                for model in (EventAttendance, EventAttendanceArchive):
+                    db_results = await session.execute(
+                        count_statement(model).where(model.event_id == event_id)
+                    )
+                    row = db_results.one_or_none()
+                    if row is not None:
+                        counts = AttendanceCount(
+                            total=row.total, present=row.present, absent=row.absent
+                        )
+                self.counts[event_id] = counts
+        return self.counts[event_id].model_copy()
+
+    def apply(self, event_id: str, total: int = 0, present: int = 0, absent: int = 0):
+        event_id = event_key(event_id)
+        counts = self.counts.get(event_id)
+        if counts is None:
+            if not self.seeded:
+                # Loaded from the database on the next read instead.
+                return
+            counts = self.counts[event_id] = AttendanceCount()
+        counts.total += total
+        counts.present += present
+        counts.absent += absent
+        self.publish(event_id)
+
+    def added(self, event_id: str, presents: Iterable[Optional[bool]]):
+        presents = list(presents)
+        if presents:
+            self.apply(
+                event_id,
+                total=len(presents),
+                present=sum(present is True for present in presents),
+                absent=sum(present is False for present in presents),
+            )
+
+    def removed(self, event_id: str, present: Optional[bool]):
+        self.apply(
+            event_id, total=-1, present=-(present is True), absent=-(present is False)
+        )
+
+    def changed(
+        self, event_id: str, changes: Iterable[Tuple[Optional[bool], Optional[bool]]]
+    ):
+        """Apply ``(present_before, present_after)`` pairs to an event's counts."""
+        present = absent = 0
+        for before, after in changes:
+            present += (after is True) - (before is True)
+            absent += (after is False) - (before is False)
+        if present or absent:
+            self.apply(event_id, present=present, absent=absent)
+
+    def subscribe(self, event_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.subscribers[event_key(event_id)].add(queue)
+        return queue
+
+    def unsubscribe(self, event_id: str, queue: asyncio.Queue):
+        event_id = event_key(event_id)
+        self.subscribers[event_id].discard(queue)
+        if not self.subscribers[event_id]:
+            self.subscribers.pop(event_id, None)
+
+    def publish(self, event_id: str):
+        counts = self.counts.get(event_id)
+        if counts is None:
+            return
+        for queue in self.subscribers.get(event_id, ()):
+            # Dashboards only need the latest counts, so drop any unread update.
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(counts.model_copy())
+
+
+attendance_counters = AttendanceCounters()
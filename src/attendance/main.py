@@ -1,52 +1,112 @@
+import asyncio
+import gzip
+from datetime import datetime
 from typing import Annotated, List, Optional, Union
 
-from admins.main import get_current_active_user
+from admins.main import get_current_active_user, get_current_stream_user
 from admins.models import Admins
-from database import get_async_session
-from events.services import get_event_name_by_id
-from fastapi import BackgroundTasks, Depends, FastAPI, Query
-from fastapi.responses import FileResponse
-from fastapi_pagination import add_pagination
+from database import async_session_maker, get_async_session
+from events.services import check_organiser_event, get_event_name_by_id
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi_pagination import add_pagination, pagination_ctx, resolve_params
 from fastapi_pagination.links import Page
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import delete_file, send_sms
-from fastapi import BackgroundTasks
+from utils import json_bytes_response
 
+from .counters import attendance_counters
 from .schemas import (
+    AnalyticsInterval,
+    AttendanceBroadcastCreate,
+    AttendanceBroadcastRead,
+    AttendanceCheckInBatch,
+    AttendanceCheckInResult,
+    AttendanceExportFormat,
+    AttendanceExportJobRead,
+    AttendanceExportStatus,
+    AttendanceImportResult,
+    AttendanceRoster,
+    EventAttendanceAnalytics,
+    EventAttendanceBulkMark,
+    EventAttendanceBulkMarkResult,
     EventAttendanceCreate,
+    EventAttendanceCursorPage,
     EventAttendanceRead,
     EventAttendanceReadWithoutId,
+    EventAttendanceSummary,
 )
 from .services import (
+    archive_event_attendance,
+    bulk_mark_attendance,
     create_attenances,
     delete_attendance,
+    get_attendance_broadcast,
+    get_attendance_export,
+    get_attendance_roster,
+    get_event_analytics,
     get_event_attendances,
     get_event_attendances_download,
+    get_event_attendances_keyset,
     get_event_summary,
+    import_attendances,
     mark_attendance,
+    read_attendance_rows,
+    start_attendance_broadcast,
+    start_attendance_export,
+    stream_event_attendances,
+    sync_attendance_checkins,
 )
 
 attendance_app = FastAPI(title="Attendance API")
 
 
-@attendance_app.get("/{event_id}", response_model=Page[EventAttendanceRead])
+@attendance_app.get(
+    "/{event_id}",
+    response_model=Union[Page[EventAttendanceRead], EventAttendanceCursorPage],
+    dependencies=[Depends(pagination_ctx(Page[EventAttendanceRead]))],
+)
 async def get_event_attandances(
     event_id: str,
     query: Optional[str] = "",
     present: Optional[bool] = None,
     occupations: Annotated[List[str] | None, Query()] = None,
     invitations: Annotated[List[str] | None, Query()] = None,
+    keyset: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     admin: Admins = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_event_attendances(
-        session=session,
-        event_id=event_id,
-        query=query,
-        present=present,
-        occupations=occupations,
-        invitations=invitations,
-    )
+    if keyset or cursor:
+        page = await get_event_attendances_keyset(
+            session=session,
+            event_id=event_id,
+            query=query,
+            size=resolve_params().size,
+            cursor=cursor,
+            include_total=include_total,
+            present=present,
+            occupations=occupations,
+            invitations=invitations,
+        )
+    else:
+        page = await get_event_attendances(
+            session=session,
+            event_id=event_id,
+            query=query,
+            present=present,
+            occupations=occupations,
+            invitations=invitations,
+        )
+    return json_bytes_response(page)
 
 
 @attendance_app.get(
@@ -60,9 +120,31 @@ async def download_event_attandances(
     present: Optional[bool] = None,
     occupations: Annotated[List[str] | None, Query()] = None,
     invitations: Annotated[List[str] | None, Query()] = None,
+    format: Optional[AttendanceExportFormat] = None,
     admin: Admins = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
+    if format is not None:
+        media_type = (
+            "text/csv"
+            if format == AttendanceExportFormat.csv
+            else "application/x-ndjson"
+        )
+        return StreamingResponse(
+            stream_event_attendances(
+                session=session,
+                event_id=event_id,
+                query=query,
+                export_format=format,
+                present=present,
+                invitations=invitations,
+                occupations=occupations,
+            ),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f"attachment; filename=attendees_{event_id}.{format.value}"
+            },
+        )
     attendees = await get_event_attendances_download(
         session=session,
         event_id=event_id,
@@ -74,7 +156,146 @@ async def download_event_attandances(
     return attendees
 
 
-@attendance_app.get("/{event_id}/summary")
+@attendance_app.get("/{event_id}/sync/roster")
+async def get_event_roster_snapshot(
+    event_id: str,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    roster = await get_attendance_roster(session=session, event_id=event_id)
+    return Response(
+        content=gzip.compress(roster.model_dump_json().encode()),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip"},
+    )
+
+
+@attendance_app.get("/{event_id}/sync/changes", response_model=AttendanceRoster)
+async def get_event_roster_changes(
+    event_id: str,
+    since: datetime,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_attendance_roster(session=session, event_id=event_id, since=since)
+
+
+@attendance_app.post(
+    "/{event_id}/sync/checkins", response_model=AttendanceCheckInResult
+)
+async def upload_event_checkins(
+    event_id: str,
+    data: AttendanceCheckInBatch,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await sync_attendance_checkins(
+        session=session, event_id=event_id, checkins=data.checkins
+    )
+
+
+@attendance_app.post("/{event_id}/exports", response_model=AttendanceExportJobRead)
+async def create_event_attandances_export(
+    *,
+    event_id: str,
+    query: Optional[str] = "",
+    present: Optional[bool] = None,
+    occupations: Annotated[List[str] | None, Query()] = None,
+    invitations: Annotated[List[str] | None, Query()] = None,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    event_name = await get_event_name_by_id(session=session, event_id=event_id)
+    return start_attendance_export(
+        event_id=event_id,
+        event_name=event_name,
+        query=query,
+        present=present,
+        occupations=occupations,
+        invitations=invitations,
+    )
+
+
+@attendance_app.get(
+    "/{event_id}/exports/{job_id}", response_model=AttendanceExportJobRead
+)
+async def get_event_attandances_export(
+    event_id: str,
+    job_id: str,
+    admin: Admins = Depends(get_current_active_user),
+):
+    return get_attendance_export(event_id=event_id, job_id=job_id)
+
+
+@attendance_app.get("/{event_id}/exports/{job_id}/download")
+async def download_event_attandances_export(
+    event_id: str,
+    job_id: str,
+    admin: Admins = Depends(get_current_active_user),
+):
+    job = get_attendance_export(event_id=event_id, job_id=job_id)
+    if job.status != AttendanceExportStatus.completed:
+        raise HTTPException(409, detail=f"Export is {job.status.value}")
+    return FileResponse(job.file_path, filename=job.file_name)
+
+
+@attendance_app.post("/{event_id}/broadcast", response_model=AttendanceBroadcastRead)
+async def broadcast_to_event_attandances(
+    *,
+    event_id: str,
+    data: AttendanceBroadcastCreate,
+    query: Optional[str] = "",
+    present: Optional[bool] = None,
+    occupations: Annotated[List[str] | None, Query()] = None,
+    invitations: Annotated[List[str] | None, Query()] = None,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    await check_organiser_event(
+        session=session, event_id=event_id, organiser_id=admin.organiser_id
+    )
+    event_name = await get_event_name_by_id(session=session, event_id=event_id)
+    return start_attendance_broadcast(
+        event_id=event_id,
+        event_name=event_name,
+        data=data,
+        query=query,
+        present=present,
+        occupations=occupations,
+        invitations=invitations,
+    )
+
+
+@attendance_app.get(
+    "/{event_id}/broadcasts/{job_id}", response_model=AttendanceBroadcastRead
+)
+async def get_event_attandances_broadcast(
+    event_id: str,
+    job_id: str,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    await check_organiser_event(
+        session=session, event_id=event_id, organiser_id=admin.organiser_id
+    )
+    return await get_attendance_broadcast(
+        session=session, event_id=event_id, job_id=job_id
+    )
+
+
+@attendance_app.get("/{event_id}/analytics", response_model=EventAttendanceAnalytics)
+async def get_event_attandances_analytics(
+    event_id: str,
+    interval: AnalyticsInterval = AnalyticsInterval.hour,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_event_analytics(
+        session=session, event_id=event_id, interval=interval
+    )
+
+
+@attendance_app.get("/{event_id}/summary", response_model=EventAttendanceSummary)
 async def get_event_attandances_summary(
     event_id: str,
     admin: Admins = Depends(get_current_active_user),
@@ -83,21 +304,75 @@ async def get_event_attandances_summary(
     return await get_event_summary(session=session, event_id=event_id)
 
 
+LIVE_KEEPALIVE_SECONDS = 15
+
+
+@attendance_app.get("/{event_id}/live")
+async def stream_event_attandances_counts(
+    event_id: str,
+    request: Request,
+    admin: Admins = Depends(get_current_stream_user),
+):
+    """Server-sent events with the event's live counts.
+
+    Browsers' ``EventSource`` cannot send an Authorization header, so the
+    admin's access token may be passed as ``?access_token=`` instead.
+    """
+    # The stream is long lived, so it must not hold a pooled connection open.
+    async with async_session_maker() as session:
+        counts = await attendance_counters.get(session=session, event_id=event_id)
+
+    async def event_stream():
+        queue = attendance_counters.subscribe(event_id)
+        try:
+            yield f"event: counts\ndata: {counts.model_dump_json()}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    update = await asyncio.wait_for(
+                        queue.get(), timeout=LIVE_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: counts\ndata: {update.model_dump_json()}\n\n"
+        finally:
+            attendance_counters.unsubscribe(event_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @attendance_app.post("/{event_id}")
 async def create_event_attendance(
     event_id: str,
     data: EventAttendanceCreate,
-    background_tasks: BackgroundTasks,
     admin: Admins = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
     print(data)
     attendee = await create_attenances(session=session, event_id=event_id, data=data)
     print(attendee)
-    # background_tasks.add_task(send_sms, phone_numbers=[attendee.phone_number])
     return attendee
 
 
+@attendance_app.post("/{event_id}/import", response_model=AttendanceImportResult)
+async def import_event_attendances(
+    event_id: str,
+    file: UploadFile,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    await get_event_name_by_id(session=session, event_id=event_id)
+    content = await file.read()
+    records = await run_in_threadpool(
+        read_attendance_rows, content, file.filename or ""
+    )
+    return await import_attendances(session=session, event_id=event_id, records=records)
+
+
 @attendance_app.patch("/{event_id}", response_model=EventAttendanceRead)
 async def mark_event_attendance(
     event_id: str,
@@ -111,6 +386,30 @@ async def mark_event_attendance(
     )
 
 
+@attendance_app.patch("/{event_id}/bulk", response_model=EventAttendanceBulkMarkResult)
+async def bulk_mark_event_attendance(
+    event_id: str,
+    data: EventAttendanceBulkMark,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await bulk_mark_attendance(
+        session=session,
+        event_id=event_id,
+        attendance_ids=data.attendee_ids,
+        present=data.present,
+    )
+
+
+@attendance_app.post("/{event_id}/archive")
+async def archive_event_attandances(
+    event_id: str,
+    admin: Admins = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await archive_event_attendance(session=session, event_id=event_id)
+
+
 @attendance_app.delete("/{event_id}")
 async def delete_event_attendance(
     event_id: str,
@@ -1,14 +1,18 @@
 import uuid
 from datetime import datetime
+from typing import Type, Union
 
 from database import Base
 from fastapi_users_db_sqlalchemy.generics import GUID
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, event
 from sqlalchemy.orm import relationship
 
 
-class EventAttendance(Base):
-    __tablename__ = "event_attandance"
+def build_search_text(*values) -> str:
+    return " ".join(value.strip().lower() for value in values if value)
+
+
+class AttendanceColumns:
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     email = Column(String(length=320), index=True, nullable=False)
     phone_number = Column(String(length=15))
@@ -16,6 +20,7 @@ class EventAttendance(Base):
     last_name = Column(String(length=30))
     location = Column(String(200))
     present = Column(Boolean, default=False)
+    checkedAt = Column(DateTime, nullable=True)
     occupation = Column(String(200))
     level = Column(String(200))
     school = Column(String(200))
@@ -27,9 +32,56 @@ class EventAttendance(Base):
     via_instagram = Column(Boolean, default=False)
     first_time = Column(Boolean, nullable=True)
     friend_name = Column(String(200))
-    event_id = Column(GUID, ForeignKey("events.id"))
-    event = relationship("Events", back_populates="attendance")
+    search_text = Column(String(400))
     createdAt = Column(DateTime, nullable=True, default=datetime.utcnow)
     updatedAt = Column(
         DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+
+
+class EventAttendance(AttendanceColumns, Base):
+    __tablename__ = "event_attandance"
+    __table_args__ = (
+        Index("ix_event_attandance_event_id_present", "event_id", "present"),
+        Index(
+            "ix_event_attandance_event_id_first_name_id", "event_id", "first_name", "id"
+        ),
+        Index("ix_event_attandance_event_id_email", "event_id", "email", unique=True),
+        Index("ix_event_attandance_event_id_updatedAt", "event_id", "updatedAt"),
+        Index(
+            "ix_event_attandance_search_text",
+            "search_text",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
+    event_id = Column(GUID, ForeignKey("events.id"))
+    event = relationship("Events", back_populates="attendance")
+
+
+class EventAttendanceArchive(AttendanceColumns, Base):
+    """Attendance of past events, moved out of ``event_attandance``."""
+
+    __tablename__ = "event_attandance_archive"
+    __table_args__ = (
+        Index(
+            "ix_event_attandance_archive_event_id_first_name_id",
+            "event_id",
+            "first_name",
+            "id",
+        ),
+    )
+    event_id = Column(GUID, nullable=False)
+    archivedAt = Column(DateTime, nullable=True, default=datetime.utcnow)
+
+
+AttendanceModel = Union[Type[EventAttendance], Type[EventAttendanceArchive]]
+ATTENDANCE_COLUMNS = [column.key for column in EventAttendance.__table__.columns]
+
+
+@event.listens_for(EventAttendance, "before_insert")
+@event.listens_for(EventAttendance, "before_update")
+def set_search_text(mapper, connection, target: EventAttendance):
+    target.search_text = build_search_text(
+        target.email, target.first_name, target.last_name
+    )
@@ -1,7 +1,45 @@
-from typing import Optional
+import string
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional
 
 from fastapi_users import models
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, validator
+
+
+class AttendanceExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class AttendanceExportStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    expired = "expired"
+
+
+class AttendanceExportJob(BaseModel):
+    id: str
+    event_id: str
+    status: AttendanceExportStatus = AttendanceExportStatus.pending
+    file_name: str
+    file_path: str
+    error: Optional[str] = None
+    createdAt: datetime = Field(default_factory=datetime.utcnow)
+    finishedAt: Optional[datetime] = None
+
+
+class AttendanceExportJobRead(BaseModel):
+    id: str
+    event_id: str
+    status: AttendanceExportStatus
+    file_name: str
+    error: Optional[str] = None
+    createdAt: datetime
+    finishedAt: Optional[datetime] = None
 
 
 class EventAttendanceReadWithoutId(BaseModel):
@@ -44,7 +82,16 @@ class EventAttendanceRead(BaseModel):
     via_instagram: Optional[bool] = None
     friend_name: Optional[str] = None
     first_time: Optional[bool] = None
-    
+
+    class Config:
+        from_attributes = True
+
+
+class EventAttendanceCursorPage(BaseModel):
+    items: List[EventAttendanceRead]
+    next_cursor: Optional[str] = None
+    size: int
+    total: Optional[int] = None
 
 
 class EventAttendanceCreate(BaseModel):
@@ -86,3 +133,150 @@ class EventAttendanceUpdate(BaseModel):
     friend_name: Optional[str] = None
     first_time: Optional[bool] = None
     
+
+
+class AttendanceCount(BaseModel):
+    total: int = 0
+    present: int = 0
+    absent: int = 0
+
+
+class FirstTimeBreakdown(BaseModel):
+    yes: int = 0
+    no: int = 0
+    unknown: int = 0
+
+
+class EventAttendanceSummary(BaseModel):
+    total: int = 0
+    present: int = 0
+    absent: int = 0
+    occupations: Dict[str, AttendanceCount] = {}
+    invitations: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "via_whatsapp": 0,
+            "via_instagram": 0,
+            "by_friend": 0,
+            "by_member": 0,
+        }
+    )
+    first_time: FirstTimeBreakdown = Field(default_factory=FirstTimeBreakdown)
+
+
+class EventAttendanceBulkMark(BaseModel):
+    attendee_ids: List[uuid.UUID]
+    present: bool
+
+
+class EventAttendanceBulkMarkResult(BaseModel):
+    present: bool
+    updated: List[uuid.UUID]
+    missing: List[uuid.UUID]
+
+
+class AttendanceImportError(BaseModel):
+    row: Optional[int] = None
+    errors: List[str]
+
+
+class AttendanceImportResult(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[AttendanceImportError] = []
+
+
+class AttendanceRoster(BaseModel):
+    columns: List[str]
+    rows: List[List[Any]]
+    watermark: Optional[datetime] = None
+
+
+class AttendanceCheckIn(BaseModel):
+    attendee_id: uuid.UUID
+    present: bool
+    checked_at: datetime
+
+    @validator("checked_at")
+    def convert_to_naive_utc(cls, checked_at: datetime):
+        if checked_at.tzinfo is not None:
+            checked_at = checked_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return checked_at
+
+
+class AttendanceCheckInBatch(BaseModel):
+    checkins: List[AttendanceCheckIn]
+
+
+class AttendanceCheckInResult(BaseModel):
+    applied: List[uuid.UUID]
+    stale: List[uuid.UUID]
+    missing: List[uuid.UUID]
+
+
+class AnalyticsInterval(str, Enum):
+    hour = "hour"
+    day = "day"
+
+
+class AnalyticsBucket(BaseModel):
+    bucket: datetime
+    count: int
+    cumulative: int
+
+
+class ChannelBucket(BaseModel):
+    bucket: datetime
+    via_whatsapp: int = 0
+    via_instagram: int = 0
+    by_friend: int = 0
+    by_member: int = 0
+
+
+class EventAttendanceAnalytics(BaseModel):
+    interval: AnalyticsInterval
+    registrations: List[AnalyticsBucket] = []
+    arrivals: List[AnalyticsBucket] = []
+    channels: List[ChannelBucket] = []
+
+
+BROADCAST_VARIABLES = {"first_name", "last_name", "event_name"}
+
+
+class AttendanceBroadcastCreate(BaseModel):
+    message: str = Field(min_length=1, max_length=918)
+    sender_id: str = Field(default="GSC24", min_length=1, max_length=11)
+
+    @validator("message")
+    def check_variables(cls, message: str):
+        for _, field_name, _, _ in string.Formatter().parse(message):
+            if field_name is not None and field_name not in BROADCAST_VARIABLES:
+                raise ValueError(
+                    f"Unknown variable {{{field_name}}}, use one of "
+                    + ", ".join(sorted(BROADCAST_VARIABLES))
+                )
+        return message
+
+
+class AttendanceBroadcastStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class AttendanceBroadcastJob(BaseModel):
+    id: str
+    event_id: str
+    status: AttendanceBroadcastStatus = AttendanceBroadcastStatus.pending
+    recipients: int = 0
+    error: Optional[str] = None
+    createdAt: datetime = Field(default_factory=datetime.utcnow)
+    finishedAt: Optional[datetime] = None
+
+
+class AttendanceBroadcastRead(AttendanceBroadcastJob):
+    sent: int = 0
+    pending: int = 0
+    failed: int = 0
@@ -1,68 +1,204 @@
+import asyncio
+import base64
+import csv
+import io
+import json
 import os
-from typing import Annotated, Any, Dict, List, Optional
+import re
+import string
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from zipfile import BadZipFile
 
 import numpy as np
 import pandas as pd
+from config import get_logger, get_settings
+from database import async_session_maker, engine
+from events.models import Events
 from fastapi import HTTPException
 from fastapi_pagination.ext.sqlalchemy import paginate
-from openpyxl import Workbook
+from notifications.models import SmsOutbox
+from notifications.schemas import SmsStatus
+from notifications.services import enqueue_sms, sms_dispatcher
+from openpyxl import Workbook, load_workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
-from sqlalchemy import func, or_, select
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import (
+    DateTime,
+    Select,
+    and_,
+    bindparam,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession
-from utils import generate_unique_filename
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from utils import count_where, delete_expired_files, generate_unique_filename
 
-from .models import EventAttendance
-from .schemas import EventAttendanceCreate
+from .counters import attendance_counters
+from .models import (
+    ATTENDANCE_COLUMNS,
+    AttendanceModel,
+    EventAttendance,
+    EventAttendanceArchive,
+    build_search_text,
+)
+from .schemas import (
+    AnalyticsBucket,
+    AnalyticsInterval,
+    AttendanceBroadcastCreate,
+    AttendanceBroadcastJob,
+    AttendanceBroadcastRead,
+    AttendanceBroadcastStatus,
+    AttendanceCheckIn,
+    AttendanceCheckInResult,
+    AttendanceCount,
+    AttendanceExportFormat,
+    AttendanceExportJob,
+    AttendanceExportStatus,
+    AttendanceImportError,
+    AttendanceImportResult,
+    AttendanceRoster,
+    ChannelBucket,
+    EventAttendanceAnalytics,
+    EventAttendanceBulkMarkResult,
+    EventAttendanceCreate,
+    EventAttendanceCursorPage,
+    EventAttendanceRead,
+    EventAttendanceReadWithoutId,
+    EventAttendanceSummary,
+)
 
+logger = get_logger()
+settings = get_settings()
 
-async def get_event_attendances(
-    session: AsyncSession,
+
+NGRAM_TOKEN_SIZE = 2
+
+
+def search_event_attendances(
+    statement: Select, query: Optional[str], model: AttendanceModel = EventAttendance
+):
+    """Restrict ``statement`` to attendees whose email or name contains ``query``.
+
+    Matches against the normalized ``search_text`` column, through the ngram
+    FULLTEXT index on MySQL and a single LIKE everywhere else, including the
+    archive table. The FULLTEXT index is built without InnoDB's stopword list,
+    so fragments such as "ma" match the same rows as the LIKE path.
+    """
+    query = build_search_text(query)
+    if not query:
+        return statement
+
+    if (
+        engine.dialect.name == "mysql"
+        and model is EventAttendance
+        and len(query) >= NGRAM_TOKEN_SIZE
+    ):
+        phrase = query.replace('"', "")
+        return statement.where(model.search_text.match(f'"{phrase}"'))
+
+    pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return statement.where(
+        model.search_text.like(f"%{pattern}%", escape="\\")
+    )
+
+
+def filter_event_attendances(
+    statement: Select,
     event_id: str,
     query: str,
     present: Optional[bool] = None,
     occupations: Annotated[List[str] | None, None] = None,
     invitations: Annotated[List[str] | None, None] = None,
+    model: AttendanceModel = EventAttendance,
 ):
-    statement = (
-        select(EventAttendance)
-        .where(EventAttendance.event_id == event_id)
-        .where(
-            or_(
-                EventAttendance.email.ilike(f"%{query}%"),
-                EventAttendance.first_name.ilike(f"%{query}%"),
-                EventAttendance.last_name.ilike(f"%{query}%"),
-            ),
-        )
+    statement = search_event_attendances(
+        statement.where(model.event_id == event_id), query=query, model=model
     )
 
     if present is not None:
-        statement = statement.where(EventAttendance.present == present)
+        statement = statement.where(model.present == present)
     if occupations is not None:
-        statement = statement.where(or_(EventAttendance.occupation.in_(occupations)))
+        statement = statement.where(or_(model.occupation.in_(occupations)))
 
     if invitations is not None:
         for invite in invitations:
             if invite == "via_whatsapp":
-                statement = statement.where(or_(EventAttendance.via_whatsapp == True))
+                statement = statement.where(or_(model.via_whatsapp == True))
 
             if invite == "via_instagram":
-                statement = statement.where(or_(EventAttendance.via_instagram == True))
+                statement = statement.where(or_(model.via_instagram == True))
 
             if invite == "by_friend":
-                statement = statement.where(or_(EventAttendance.by_friend == True))
+                statement = statement.where(or_(model.by_friend == True))
 
             if invite == "by_member":
-                statement = statement.where(or_(EventAttendance.by_member == True))
-    statement = statement.order_by(EventAttendance.first_name)
+                statement = statement.where(or_(model.by_member == True))
+    return statement
+
+
+LIST_COLUMNS = list(EventAttendanceRead.model_fields)
+attendee_list_adapter = TypeAdapter(List[EventAttendanceRead])
+
+
+def rows_to_attendees(rows) -> List[EventAttendanceRead]:
+    return attendee_list_adapter.validate_python([row._asdict() for row in rows])
 
+
+def model_columns(model: AttendanceModel, columns: List[str]):
+    return [getattr(model, column) for column in columns]
+
+
+async def get_attendance_model(
+    session: Union[AsyncSession, AsyncConnection], event_id: str
+) -> AttendanceModel:
+    """Return the table holding an event's attendance, hot or archived."""
     try:
-        return await paginate(conn=session, query=statement)
+        archived_at = await session.scalar(
+            select(Events.attendanceArchivedAt).where(Events.id == event_id)
+        )
     except SQLAlchemyError:
         raise HTTPException(500, detail="Something went wrong")
+    return EventAttendance if archived_at is None else EventAttendanceArchive
 
 
-async def get_event_attendances_download(
+async def check_attendance_writable(
+    session: AsyncSession, event_id: str
+) -> AttendanceModel:
+    """Reject writes to an event whose attendance has been archived.
+
+    Reads of an archived event only look at the archive table, so a row
+    written to the hot table would never be seen again. Returns the model
+    to write to.
+    """
+    model = await get_attendance_model(session=session, event_id=event_id)
+    if model is EventAttendanceArchive:
+        raise HTTPException(409, detail="Attendance of this event is archived")
+    return model
+
+
+async def get_event_attendances(
     session: AsyncSession,
     event_id: str,
     query: str,
@@ -70,39 +206,134 @@ async def get_event_attendances_download(
     occupations: Annotated[List[str] | None, None] = None,
     invitations: Annotated[List[str] | None, None] = None,
 ):
-    statement = (
-        select(EventAttendance)
-        .where(EventAttendance.event_id == event_id)
-        .where(
-            or_(
-                EventAttendance.email.ilike(f"%{query}%"),
-                EventAttendance.first_name.ilike(f"%{query}%"),
-                EventAttendance.last_name.ilike(f"%{query}%"),
-            ),
-        )
+    model = await get_attendance_model(session=session, event_id=event_id)
+    statement = filter_event_attendances(
+        select(*model_columns(model, LIST_COLUMNS)),
+        event_id=event_id,
+        query=query,
+        present=present,
+        occupations=occupations,
+        invitations=invitations,
+        model=model,
     )
+    statement = statement.order_by(model.first_name)
 
-    if present is not None:
-        statement = statement.where(EventAttendance.present == present)
+    try:
+        return await paginate(
+            conn=session, query=statement, transformer=rows_to_attendees
+        )
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
 
-    if occupations is not None:
-        statement = statement.where(or_(EventAttendance.occupation.in_(occupations)))
 
-    if invitations is not None:
-        for invite in invitations:
-            if invite == "via_whatsapp":
-                statement = statement.where(or_(EventAttendance.via_whatsapp == True))
+def encode_attendance_cursor(attendee: EventAttendanceRead) -> str:
+    payload = json.dumps([attendee.first_name, str(attendee.id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
 
-            if invite == "via_instagram":
-                statement = statement.where(or_(EventAttendance.via_instagram == True))
 
-            if invite == "by_friend":
-                statement = statement.where(or_(EventAttendance.by_friend == True))
+def decode_attendance_cursor(cursor: str):
+    try:
+        first_name, attendee_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return first_name, uuid.UUID(attendee_id)
+    except (ValueError, TypeError):
+        raise HTTPException(400, detail="Invalid cursor")
 
-            if invite == "by_member":
-                statement = statement.where(or_(EventAttendance.by_member == True))
 
-    statement = statement.order_by(EventAttendance.first_name)
+async def get_event_attendances_keyset(
+    session: AsyncSession,
+    event_id: str,
+    query: str,
+    size: int,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    present: Optional[bool] = None,
+    occupations: Annotated[List[str] | None, None] = None,
+    invitations: Annotated[List[str] | None, None] = None,
+):
+    """Page through attendees ordered by (first_name, id) without OFFSET.
+
+    The cursor encodes the last row of the previous page, so every page costs
+    the same and rows registered while scrolling do not shift the results.
+    """
+    model = await get_attendance_model(session=session, event_id=event_id)
+    filters = dict(
+        event_id=event_id,
+        query=query,
+        present=present,
+        occupations=occupations,
+        invitations=invitations,
+        model=model,
+    )
+    statement = filter_event_attendances(
+        select(*model_columns(model, LIST_COLUMNS)), **filters
+    )
+
+    if cursor:
+        first_name, last_id = decode_attendance_cursor(cursor)
+        # NULL first names sort first, so they only need the id tie-break.
+        if first_name is None:
+            statement = statement.where(
+                or_(
+                    and_(
+                        model.first_name.is_(None),
+                        model.id > last_id,
+                    ),
+                    model.first_name.is_not(None),
+                )
+            )
+        else:
+            statement = statement.where(
+                or_(
+                    model.first_name > first_name,
+                    and_(
+                        model.first_name == first_name,
+                        model.id > last_id,
+                    ),
+                )
+            )
+    statement = statement.order_by(model.first_name, model.id)
+
+    try:
+        db_results = await session.execute(statement.limit(size + 1))
+        attendees = rows_to_attendees(db_results.all())
+        total = None
+        if include_total:
+            total = await session.scalar(
+                filter_event_attendances(
+                    select(func.count()).select_from(model), **filters
+                )
+            )
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+
+    next_cursor = None
+    if len(attendees) > size:
+        attendees = attendees[:size]
+        next_cursor = encode_attendance_cursor(attendees[-1])
+    return EventAttendanceCursorPage(
+        items=attendees, next_cursor=next_cursor, size=size, total=total
+    )
+
+
+async def get_event_attendances_download(
+    session: AsyncSession,
+    event_id: str,
+    query: str,
+    present: Optional[bool] = None,
+    occupations: Annotated[List[str] | None, None] = None,
+    invitations: Annotated[List[str] | None, None] = None,
+):
+    model = await get_attendance_model(session=session, event_id=event_id)
+    statement = filter_event_attendances(
+        select(model),
+        event_id=event_id,
+        query=query,
+        present=present,
+        occupations=occupations,
+        invitations=invitations,
+        model=model,
+    )
+    statement = statement.order_by(model.first_name)
     try:
         db_results = await session.execute(statement=statement)
         attendees = db_results.scalars().all()
@@ -111,45 +342,114 @@ async def get_event_attendances_download(
         raise HTTPException(500, detail="Something went wrong")
 
 
-async def get_total_event_attendance(session: AsyncSession, event_id: str):
+EXPORT_COLUMNS = list(EventAttendanceReadWithoutId.model_fields.keys())
+
+
+async def stream_event_attendances(
+    session: AsyncSession,
+    event_id: str,
+    query: str,
+    export_format: AttendanceExportFormat,
+    present: Optional[bool] = None,
+    occupations: Annotated[List[str] | None, None] = None,
+    invitations: Annotated[List[str] | None, None] = None,
+    chunk_size: int = 1000,
+) -> AsyncIterator[str]:
+    """Yield the attendees of an event as CSV or NDJSON, one chunk of rows at a time.
+
+    Rows are fetched through a server side cursor so memory usage does not
+    grow with the size of the event.
+    """
+    model = await get_attendance_model(session=session, event_id=event_id)
+    statement = filter_event_attendances(
+        select(*model_columns(model, EXPORT_COLUMNS)),
+        event_id=event_id,
+        query=query,
+        present=present,
+        occupations=occupations,
+        invitations=invitations,
+        model=model,
+    )
+    statement = statement.order_by(model.first_name).execution_options(
+        yield_per=chunk_size
+    )
+
+    if export_format == AttendanceExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+
     try:
-        count = await session.scalar(
-            select(func.count())
-            .select_from(EventAttendance)
-            .where(EventAttendance.event_id == event_id)
-        )
-        return count
+        db_results = await session.stream(statement)
+        async for rows in db_results.partitions():
+            if export_format == AttendanceExportFormat.csv:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(row._asdict(), default=str) + "\n" for row in rows
+                )
     except SQLAlchemyError:
-        raise HTTPException(500, detail="Something went wrong")
+        logger.error("Unable to stream event attendances", exc_info=True)
+        raise
 
 
-async def get_total_present_attendees(
-    session: AsyncSession, event_id: str, present: bool
-):
-    try:
-        count = await session.scalar(
-            select(func.count())
-            .select_from(EventAttendance)
-            .where(
-                EventAttendance.event_id == event_id, EventAttendance.present == present
-            )
+INVITATION_CHANNELS = ["via_whatsapp", "via_instagram", "by_friend", "by_member"]
+
+
+async def get_event_summary(session: AsyncSession, event_id: str):
+    """Summarise an event's attendance in a single grouped query.
+
+    Rows are grouped by occupation with conditional sums for every breakdown,
+    and the event wide totals are added up from the groups.
+    """
+    model = await get_attendance_model(session=session, event_id=event_id)
+    statement = (
+        select(
+            model.occupation,
+            func.count().label("total"),
+            count_where(model.present == True).label("present"),
+            count_where(model.present == False).label("absent"),
+            count_where(model.first_time == True).label("first_time"),
+            count_where(model.first_time == False).label("not_first_time"),
+            *[
+                count_where(getattr(model, channel) == True).label(channel)
+                for channel in INVITATION_CHANNELS
+            ],
         )
-        return count
+        .where(model.event_id == event_id)
+        .group_by(model.occupation)
+    )
+    try:
+        db_results = await session.execute(statement)
+        groups = db_results.all()
     except SQLAlchemyError:
         raise HTTPException(500, detail="Something went wrong")
 
-
-async def get_event_summary(session: AsyncSession, event_id: str, present: bool = True):
-    total_attendance = await get_total_event_attendance(
-        session=session, event_id=event_id
-    )
-    total_present = await get_total_present_attendees(
-        session=session, event_id=event_id, present=present
-    )
-    total_absent = await get_total_present_attendees(
-        session=session, event_id=event_id, present=False
+    summary = EventAttendanceSummary()
+    for group in groups:
+        summary.total += group.total
+        summary.present += group.present
+        summary.absent += group.absent
+        summary.first_time.yes += group.first_time
+        summary.first_time.no += group.not_first_time
+        for channel in INVITATION_CHANNELS:
+            summary.invitations[channel] += getattr(group, channel)
+        # Attendees without an occupation share the "unknown" bucket with
+        # anyone who typed "unknown", so add rather than overwrite.
+        occupation = summary.occupations.setdefault(
+            group.occupation or "unknown", AttendanceCount()
+        )
+        occupation.total += group.total
+        occupation.present += group.present
+        occupation.absent += group.absent
+    summary.first_time.unknown = (
+        summary.total - summary.first_time.yes - summary.first_time.no
     )
-    return {"total": total_attendance, "present": total_present, "absent": total_absent}
+    return summary
 
 
 async def get_event_attendance_by_id(
@@ -170,35 +470,516 @@ async def get_event_attendance_by_id(
         raise HTTPException(500, detail="Something went wrong")
 
 
+def build_attendance_row(event_id: str, data: EventAttendanceCreate) -> Dict[str, Any]:
+    row = data.model_dump()
+    row["id"] = uuid.uuid4()
+    row["event_id"] = event_id
+    row["search_text"] = build_search_text(data.email, data.first_name, data.last_name)
+    return row
+
+
+def insert_ignoring_duplicates():
+    """INSERT into event_attandance that skips rows clashing on (event_id, email)."""
+    if engine.dialect.name == "mysql":
+        statement = mysql_insert(EventAttendance)
+        return statement.on_duplicate_key_update(id=EventAttendance.id)
+    if engine.dialect.name == "sqlite":
+        return sqlite_insert(EventAttendance).on_conflict_do_nothing(
+            index_elements=["event_id", "email"]
+        )
+    return insert(EventAttendance)
+
+
+async def upsert_attendance(
+    session: AsyncSession,
+    event_id: str,
+    data: EventAttendanceCreate,
+    sms_message: Optional[str] = None,
+) -> Tuple[EventAttendance, bool]:
+    """Register an attendee once per event, returning ``(attendee, created)``.
+
+    A retried or repeated RSVP for the same email is a no-op that returns the
+    attendee already stored. With ``sms_message``, a newly created attendee's
+    SMS is queued in the outbox in the same transaction.
+    """
+    await check_attendance_writable(session=session, event_id=event_id)
+    row = build_attendance_row(event_id=event_id, data=data)
+    try:
+        await session.execute(insert_ignoring_duplicates().values(**row))
+        db_result = await session.execute(
+            select(EventAttendance).where(
+                EventAttendance.event_id == event_id,
+                EventAttendance.email == data.email,
+            )
+        )
+        attendee = db_result.scalar_one()
+        created = attendee.id == row["id"]
+        queued = 0
+        if created and sms_message:
+            queued = await enqueue_sms(
+                session=session,
+                phone_numbers=[attendee.phone_number],
+                message=sms_message,
+            )
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(500, detail="Something went wrong")
+
+    if created:
+        attendance_counters.added(event_id, [attendee.present])
+    if queued:
+        sms_dispatcher.notify()
+    return attendee, created
+
+
 async def create_attenances(
     session: AsyncSession, event_id: str, data: EventAttendanceCreate
 ):
-    new_attendance = EventAttendance(**data.model_dump(), event_id=event_id)
-    session.add(new_attendance)
-    await session.commit()
-    return new_attendance
+    attendee, _ = await upsert_attendance(session=session, event_id=event_id, data=data)
+    return attendee
 
 
 async def delete_attendance(session: AsyncSession, event_id: str, attendance_id: str):
+    await check_attendance_writable(session=session, event_id=event_id)
     attendee = await get_event_attendance_by_id(
         event_id=event_id, attendance_id=attendance_id, session=session
     )
     await session.delete(attendee)
     await session.commit()
+    attendance_counters.removed(event_id, attendee.present)
     return True
 
 
 async def mark_attendance(
     session: AsyncSession, event_id: str, attendance_id: str, present: bool
 ):
+    await check_attendance_writable(session=session, event_id=event_id)
     attendee = await get_event_attendance_by_id(
         event_id=event_id, attendance_id=attendance_id, session=session
     )
+    previous = attendee.present
     attendee.present = present
+    attendee.checkedAt = datetime.utcnow()
     await session.commit()
+    attendance_counters.changed(event_id, [(previous, present)])
     return attendee
 
 
+async def bulk_mark_attendance(
+    session: AsyncSession, event_id: str, attendance_ids: List[uuid.UUID], present: bool
+):
+    await check_attendance_writable(session=session, event_id=event_id)
+    attendance_ids = list(dict.fromkeys(attendance_ids))
+    try:
+        db_results = await session.execute(
+            select(EventAttendance.id, EventAttendance.present).where(
+                EventAttendance.id.in_(attendance_ids),
+                EventAttendance.event_id == event_id,
+            )
+        )
+        matched = dict(db_results.all())
+        if matched:
+            await session.execute(
+                update(EventAttendance)
+                .where(
+                    EventAttendance.id.in_(list(matched)),
+                    EventAttendance.event_id == event_id,
+                )
+                .values(present=present, checkedAt=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(500, detail="Something went wrong")
+
+    attendance_counters.changed(
+        event_id, [(previous, present) for previous in matched.values()]
+    )
+    return EventAttendanceBulkMarkResult(
+        present=present,
+        updated=[id for id in attendance_ids if id in matched],
+        missing=[id for id in attendance_ids if id not in matched],
+    )
+
+
+ANALYTICS_FREQUENCIES = {AnalyticsInterval.hour: "h", AnalyticsInterval.day: "D"}
+
+
+def bucket_counts(timestamps: pd.Series, frequency: str) -> List[AnalyticsBucket]:
+    counts = timestamps.dropna().dt.floor(frequency).value_counts().sort_index()
+    cumulative = np.cumsum(counts.to_numpy())
+    return [
+        AnalyticsBucket(bucket=bucket, count=count, cumulative=total)
+        for bucket, count, total in zip(
+            counts.index.to_pydatetime(), counts.to_numpy().tolist(), cumulative.tolist()
+        )
+    ]
+
+
+async def get_event_analytics(
+    session: AsyncSession, event_id: str, interval: AnalyticsInterval
+):
+    """Registration and check-in curves for an event, bucketed by hour or day.
+
+    Only the timestamp and channel columns are loaded, and all bucketing is
+    done with vectorized pandas operations.
+    """
+    columns = ["createdAt", "checkedAt", "present", *INVITATION_CHANNELS]
+    model = await get_attendance_model(session=session, event_id=event_id)
+    statement = select(*model_columns(model, columns)).where(
+        model.event_id == event_id
+    )
+    try:
+        db_results = await session.execute(statement)
+        df = pd.DataFrame.from_records(db_results.all(), columns=columns)
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+
+    analytics = EventAttendanceAnalytics(interval=interval)
+    if df.empty:
+        return analytics
+
+    frequency = ANALYTICS_FREQUENCIES[interval]
+    created = pd.to_datetime(df["createdAt"])
+    checked = pd.to_datetime(df["checkedAt"]).where(df["present"] == True)
+
+    analytics.registrations = bucket_counts(created, frequency)
+    analytics.arrivals = bucket_counts(checked, frequency)
+
+    channels = (
+        df[INVITATION_CHANNELS]
+        .fillna(False)
+        .astype(int)
+        .groupby(created.dt.floor(frequency))
+        .sum()
+    )
+    analytics.channels = [
+        ChannelBucket(bucket=bucket, **counts)
+        for bucket, counts in zip(
+            channels.index.to_pydatetime(), channels.to_dict("records")
+        )
+    ]
+    return analytics
+
+
+ROSTER_COLUMNS = [
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "present",
+    "checkedAt",
+    "updatedAt",
+]
+
+
+async def get_attendance_roster(
+    session: AsyncSession, event_id: str, since: Optional[datetime] = None
+):
+    """Return the event roster as column names plus value rows.
+
+    With ``since`` only rows updated after that watermark are returned. The
+    returned watermark is what the client should send on its next sync.
+
+    ``updatedAt`` is stamped when a statement runs, not when it commits, so a
+    long transaction can commit rows older than a watermark already handed
+    out. The watermark therefore never passes ``roster_sync_overlap_seconds``
+    before the read; rows in that window are sent again on the next sync.
+    """
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    safe_before = datetime.utcnow() - timedelta(
+        seconds=settings.roster_sync_overlap_seconds
+    )
+    model = await get_attendance_model(session=session, event_id=event_id)
+    statement = select(*[getattr(model, column) for column in ROSTER_COLUMNS]).where(
+        model.event_id == event_id
+    )
+    if since is not None:
+        statement = statement.where(model.updatedAt > since)
+    statement = statement.order_by(model.updatedAt)
+
+    try:
+        db_results = await session.execute(statement)
+        rows = [list(row) for row in db_results.all()]
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+
+    updated_at = ROSTER_COLUMNS.index("updatedAt")
+    watermark = max(
+        (row[updated_at] for row in rows if row[updated_at] is not None),
+        default=since,
+    )
+    if watermark is not None and watermark > safe_before:
+        watermark = max(since, safe_before) if since is not None else safe_before
+    return AttendanceRoster(columns=ROSTER_COLUMNS, rows=rows, watermark=watermark)
+
+
+async def sync_attendance_checkins(
+    session: AsyncSession, event_id: str, checkins: List[AttendanceCheckIn]
+):
+    """Apply check-ins queued offline, keeping the most recent one per attendee.
+
+    A check-in only wins if it happened after the attendee's stored
+    ``checkedAt``, so replays and slower tablets cannot undo newer changes.
+    """
+    model = await check_attendance_writable(session=session, event_id=event_id)
+    latest: Dict[uuid.UUID, AttendanceCheckIn] = {}
+    for checkin in checkins:
+        current = latest.get(checkin.attendee_id)
+        if current is None or checkin.checked_at > current.checked_at:
+            latest[checkin.attendee_id] = checkin
+
+    try:
+        db_results = await session.execute(
+            select(model.id, model.checkedAt, model.present).where(
+                model.id.in_(latest.keys()), model.event_id == event_id
+            )
+        )
+        stored = {row.id: row for row in db_results.all()}
+
+        winners = [
+            checkin
+            for attendee_id, checkin in latest.items()
+            if attendee_id in stored
+            and (
+                stored[attendee_id].checkedAt is None
+                or stored[attendee_id].checkedAt < checkin.checked_at
+            )
+        ]
+        if winners:
+            table = model.__table__
+            await session.execute(
+                update(table)
+                .where(
+                    table.c.id == bindparam("attendee_id"),
+                    table.c.event_id == event_id,
+                    or_(
+                        table.c.checkedAt.is_(None),
+                        table.c.checkedAt < bindparam("checked_at"),
+                    ),
+                )
+                .values(present=bindparam("present"), checkedAt=bindparam("checked_at")),
+                [checkin.model_dump() for checkin in winners],
+            )
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(500, detail="Something went wrong")
+
+    attendance_counters.changed(
+        event_id,
+        [(stored[checkin.attendee_id].present, checkin.present) for checkin in winners],
+    )
+    applied = [checkin.attendee_id for checkin in winners]
+    return AttendanceCheckInResult(
+        applied=applied,
+        stale=[id for id in latest if id in stored and id not in applied],
+        missing=[id for id in latest if id not in stored],
+    )
+
+
+IMPORT_BATCH_SIZE = 1000
+
+
+def clean_cell(value: Any):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_attendance_rows(content: bytes, filename: str) -> List[Dict[str, Any]]:
+    """Parse an uploaded CSV or XLSX roster into a list of row dicts.
+
+    Headers are normalized to the ``EventAttendanceCreate`` field names and
+    blank cells become ``None``. Files that cannot be read are rejected with
+    a 400.
+    """
+    is_xlsx = filename.lower().endswith(".xlsx")
+    if not is_xlsx and not filename.lower().endswith(".csv"):
+        raise HTTPException(400, detail="Only .csv and .xlsx files are supported")
+
+    try:
+        if is_xlsx:
+            wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+            rows = wb.active.iter_rows(values_only=True)
+        else:
+            rows = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+        header = next(rows, None) or []
+        keys = [
+            str(column).strip().lower().replace(" ", "_") if column else None
+            for column in header
+        ]
+        records = []
+        for row in rows:
+            record = {key: clean_cell(value) for key, value in zip(keys, row) if key}
+            records.append(
+                {key: value for key, value in record.items() if value not in ("", None)}
+            )
+    except UnicodeDecodeError:
+        raise HTTPException(400, detail="CSV files must be UTF-8 encoded")
+    except (BadZipFile, InvalidFileException, KeyError):
+        raise HTTPException(400, detail="The file is not a valid .xlsx workbook")
+    return records
+
+
+async def import_attendances(
+    session: AsyncSession, event_id: str, records: List[Dict[str, Any]]
+):
+    await check_attendance_writable(session=session, event_id=event_id)
+    errors = []
+    valid_rows = []
+    received = 0
+    for index, record in enumerate(records, start=2):
+        if not record:
+            continue
+        received += 1
+        try:
+            data = EventAttendanceCreate(**record)
+        except ValidationError as e:
+            errors.append(
+                AttendanceImportError(
+                    row=index,
+                    errors=[
+                        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    ],
+                )
+            )
+            continue
+        valid_rows.append(build_attendance_row(event_id=event_id, data=data))
+
+    inserted = failed = 0
+    for start in range(0, len(valid_rows), IMPORT_BATCH_SIZE):
+        batch = valid_rows[start : start + IMPORT_BATCH_SIZE]
+        try:
+            await session.execute(insert_ignoring_duplicates(), batch)
+            await session.commit()
+            created = set(
+                await session.scalars(
+                    select(EventAttendance.id).where(
+                        EventAttendance.id.in_([row["id"] for row in batch])
+                    )
+                )
+            )
+            inserted += len(created)
+            attendance_counters.added(
+                event_id, [row["present"] for row in batch if row["id"] in created]
+            )
+        except SQLAlchemyError:
+            await session.rollback()
+            logger.error("Unable to import attendance batch", exc_info=True)
+            failed += len(batch)
+            errors.append(
+                AttendanceImportError(
+                    row=None,
+                    errors=[
+                        f"Rows {start + 1} to {start + len(batch)} of the valid rows "
+                        "could not be saved"
+                    ],
+                )
+            )
+
+    return AttendanceImportResult(
+        received=received,
+        inserted=inserted,
+        duplicates=len(valid_rows) - inserted - failed,
+        failed=failed,
+        errors=errors,
+    )
+
+
+def attendance_archive_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=settings.attendance_archive_after_days)
+
+
+async def archive_event_attendance(session: AsyncSession, event_id: str):
+    """Move an event's attendance from the hot table into the archive table.
+
+    Only events that started more than ``attendance_archive_after_days`` ago
+    can be archived, since archived events no longer accept attendance
+    writes. The copy, the delete and flagging the event happen in one
+    transaction, so reads see the roster in exactly one of the two tables.
+    """
+    try:
+        event = (
+            await session.execute(
+                select(Events.start_date, Events.attendanceArchivedAt).where(
+                    Events.id == event_id
+                )
+            )
+        ).one_or_none()
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+    if event is None:
+        raise HTTPException(404, detail="Event not found")
+    if event.attendanceArchivedAt is not None:
+        raise HTTPException(409, detail="Attendance of this event is archived")
+    if event.start_date is None or event.start_date >= attendance_archive_cutoff():
+        raise HTTPException(
+            409,
+            detail=(
+                "Only events that started more than "
+                f"{settings.attendance_archive_after_days} days ago can be archived"
+            ),
+        )
+
+    hot = EventAttendance.__table__
+    archive = EventAttendanceArchive.__table__
+    archived_at = datetime.utcnow()
+    try:
+        await session.execute(
+            archive.insert().from_select(
+                [*ATTENDANCE_COLUMNS, "archivedAt"],
+                select(
+                    *[hot.c[column] for column in ATTENDANCE_COLUMNS],
+                    literal(archived_at, DateTime).label("archivedAt"),
+                ).where(hot.c.event_id == event_id),
+            )
+        )
+        await session.execute(hot.delete().where(hot.c.event_id == event_id))
+        await session.execute(
+            update(Events)
+            .where(Events.id == event_id)
+            .values(attendanceArchivedAt=archived_at)
+        )
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        logger.error(f"Unable to archive attendance of event {event_id}", exc_info=True)
+        raise HTTPException(500, detail="Something went wrong")
+    return True
+
+
+async def archive_past_events_attendance():
+    archived = []
+    async with async_session_maker() as session:
+        event_ids = (
+            await session.scalars(
+                select(Events.id).where(
+                    Events.start_date < attendance_archive_cutoff(),
+                    Events.attendanceArchivedAt.is_(None),
+                )
+            )
+        ).all()
+        for event_id in event_ids:
+            # One failing event must not stop the rest of the run.
+            try:
+                await archive_event_attendance(session=session, event_id=event_id)
+            except HTTPException as e:
+                logger.warning(f"Skipped archiving event {event_id}: {e.detail}")
+                continue
+            archived.append(event_id)
+    if archived:
+        logger.info(f"Archived attendance of {len(archived)} past events")
+    return archived
+
+
 ATTENDANCE_ROOT_FOLDER = os.path.join(os.getcwd(), "attendance")
 
 
@@ -217,3 +998,322 @@ def create_excel_file_with_attendees(
 
     wb.save(excel_file)
     return excel_file, file_name
+
+
+# Export jobs live in the memory of the worker that started them. With several
+# workers, a poll that lands on another worker gets a 404, so deployments
+# running exports need sticky sessions or a single worker.
+EXPORT_JOBS: Dict[str, AttendanceExportJob] = {}
+EXPORT_FILENAME_PATTERN = re.compile(r"[^\w\- ]+")
+_export_tasks: Set[asyncio.Task] = set()
+_export_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_export_pool() -> ProcessPoolExecutor:
+    global _export_pool
+    if _export_pool is None:
+        _export_pool = ProcessPoolExecutor(max_workers=settings.export_workers)
+    return _export_pool
+
+
+def shutdown_export_pool():
+    global _export_pool
+    if _export_pool is not None:
+        _export_pool.shutdown(wait=False, cancel_futures=True)
+        _export_pool = None
+
+
+async def write_attendance_workbook(
+    file_path: str,
+    event_id: str,
+    query: str,
+    present: Optional[bool] = None,
+    occupations: Optional[List[str]] = None,
+    invitations: Optional[List[str]] = None,
+    chunk_size: int = 1000,
+):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(EXPORT_COLUMNS)
+
+    # Runs in a worker process, so it cannot share the app's engine or pool.
+    export_engine = create_async_engine(settings.db_url)
+    try:
+        async with export_engine.connect() as conn:
+            model = await get_attendance_model(session=conn, event_id=event_id)
+            statement = filter_event_attendances(
+                select(*model_columns(model, EXPORT_COLUMNS)),
+                event_id=event_id,
+                query=query,
+                present=present,
+                occupations=occupations,
+                invitations=invitations,
+                model=model,
+            )
+            statement = statement.order_by(model.first_name).execution_options(
+                yield_per=chunk_size
+            )
+            db_results = await conn.stream(statement)
+            async for rows in db_results.partitions():
+                for row in rows:
+                    ws.append(list(row))
+    finally:
+        await export_engine.dispose()
+
+    wb.save(file_path)
+
+
+def build_attendance_workbook(file_path: str, event_id: str, query: str, **filters):
+    asyncio.run(
+        write_attendance_workbook(
+            file_path=file_path, event_id=event_id, query=query, **filters
+        )
+    )
+    return file_path
+
+
+async def run_attendance_export(job: AttendanceExportJob, **filters):
+    job.status = AttendanceExportStatus.running
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(
+            get_export_pool(),
+            partial(
+                build_attendance_workbook,
+                job.file_path,
+                str(job.event_id),
+                **filters,
+            ),
+        )
+        job.status = AttendanceExportStatus.completed
+    except Exception as e:
+        logger.error(f"Attendance export {job.id} failed", exc_info=True)
+        job.status = AttendanceExportStatus.failed
+        job.error = str(e)
+    job.finishedAt = datetime.utcnow()
+
+
+def start_attendance_export(
+    event_id: str,
+    event_name: str,
+    query: str,
+    present: Optional[bool] = None,
+    occupations: Optional[List[str]] = None,
+    invitations: Optional[List[str]] = None,
+):
+    os.makedirs(ATTENDANCE_ROOT_FOLDER, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    # The event name is only used for the download name, never on disk.
+    download_name = EXPORT_FILENAME_PATTERN.sub("_", event_name or "").strip("._ ")
+    job = AttendanceExportJob(
+        id=job_id,
+        event_id=event_id,
+        file_name=f"{download_name or 'event'}_attendees.xlsx",
+        file_path=os.path.join(ATTENDANCE_ROOT_FOLDER, f"{job_id}.xlsx"),
+    )
+    EXPORT_JOBS[job.id] = job
+
+    task = asyncio.create_task(
+        run_attendance_export(
+            job,
+            query=query,
+            present=present,
+            occupations=occupations,
+            invitations=invitations,
+        )
+    )
+    _export_tasks.add(task)
+    task.add_done_callback(_export_tasks.discard)
+    return job
+
+
+def get_attendance_export(event_id: str, job_id: str):
+    job = EXPORT_JOBS.get(job_id)
+    if job is None or str(job.event_id) != str(event_id):
+        raise HTTPException(404, detail="Export not found")
+    if job.status == AttendanceExportStatus.completed and not os.path.exists(
+        job.file_path
+    ):
+        job.status = AttendanceExportStatus.expired
+    return job
+
+
+def expire_attendance_exports():
+    delete_expired_files(
+        folder=ATTENDANCE_ROOT_FOLDER,
+        max_age=settings.export_file_ttl,
+        suffix=".xlsx",
+    )
+    expired_before = datetime.utcnow().timestamp() - settings.export_file_ttl
+    for job_id, job in list(EXPORT_JOBS.items()):
+        if job.finishedAt and job.finishedAt.timestamp() < expired_before:
+            EXPORT_JOBS.pop(job_id, None)
+    for job_id, job in list(BROADCAST_JOBS.items()):
+        if job.finishedAt and job.finishedAt.timestamp() < expired_before:
+            BROADCAST_JOBS.pop(job_id, None)
+
+
+BROADCAST_JOBS: Dict[str, AttendanceBroadcastJob] = {}
+_broadcast_tasks: Set[asyncio.Task] = set()
+ATTENDEE_BROADCAST_VARIABLES = ("first_name", "last_name")
+
+
+def build_broadcast_template(message: str, event_name: str) -> Tuple[str, bool]:
+    """Turn a broadcast message into Arkesel's template syntax.
+
+    ``{event_name}`` is the same for every recipient and is filled in here,
+    while the attendee variables become ``<%...%>`` placeholders. Returns the
+    template and whether it needs per recipient values.
+    """
+    fields = {field for _, field, _, _ in string.Formatter().parse(message) if field}
+    template = message.format(
+        event_name=event_name or "",
+        **{variable: f"<%{variable}%>" for variable in ATTENDEE_BROADCAST_VARIABLES},
+    )
+    return template, any(
+        variable in fields for variable in ATTENDEE_BROADCAST_VARIABLES
+    )
+
+
+async def run_attendance_broadcast(
+    job: AttendanceBroadcastJob,
+    event_name: str,
+    data: AttendanceBroadcastCreate,
+    query: str,
+    present: Optional[bool] = None,
+    occupations: Optional[List[str]] = None,
+    invitations: Optional[List[str]] = None,
+):
+    """Walk the filtered attendees in id-ordered chunks and send each chunk.
+
+    Chunks are read with short keyset queries rather than one long cursor so no
+    read transaction stays open while SMS requests are in flight. Every chunk
+    is written to the SMS outbox already claimed by this job, so rows that
+    fail here are retried by the dispatcher like any other SMS. Personalised
+    messages are stored as one template plus each attendee's values, so they
+    are sent in batches too.
+    """
+    job.status = AttendanceBroadcastStatus.running
+    template, personalised = build_broadcast_template(data.message, event_name)
+    seen: Set[str] = set()
+    last_id = None
+    try:
+        async with async_session_maker() as session:
+            model = await get_attendance_model(session=session, event_id=job.event_id)
+            statement = filter_event_attendances(
+                select(model.id, model.phone_number, model.first_name, model.last_name),
+                event_id=job.event_id,
+                query=query,
+                present=present,
+                occupations=occupations,
+                invitations=invitations,
+                model=model,
+            ).order_by(model.id)
+            while True:
+                chunk_statement = statement.limit(settings.sms_broadcast_chunk_size)
+                if last_id is not None:
+                    chunk_statement = chunk_statement.where(model.id > last_id)
+                rows = (await session.execute(chunk_statement)).all()
+                await session.commit()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                claimed_at = datetime.utcnow()
+                messages = []
+                for row in rows:
+                    if not row.phone_number or row.phone_number in seen:
+                        continue
+                    seen.add(row.phone_number)
+                    messages.append(
+                        SmsOutbox(
+                            phone_number=row.phone_number,
+                            sender_id=data.sender_id,
+                            message=template,
+                            variables=(
+                                {
+                                    "first_name": row.first_name or "",
+                                    "last_name": row.last_name or "",
+                                }
+                                if personalised
+                                else None
+                            ),
+                            broadcast_id=job.id,
+                            status=SmsStatus.sending.value,
+                            claimed_at=claimed_at,
+                        )
+                    )
+                if not messages:
+                    continue
+                session.add_all(messages)
+                await session.commit()
+                job.recipients += len(messages)
+                await sms_dispatcher.deliver(messages)
+                await session.commit()
+                session.expunge_all()
+        job.status = AttendanceBroadcastStatus.completed
+    except Exception as e:
+        logger.error(f"Attendance broadcast {job.id} failed", exc_info=True)
+        job.status = AttendanceBroadcastStatus.failed
+        job.error = str(e)
+    job.finishedAt = datetime.utcnow()
+
+
+def start_attendance_broadcast(
+    event_id: str,
+    event_name: str,
+    data: AttendanceBroadcastCreate,
+    query: str,
+    present: Optional[bool] = None,
+    occupations: Optional[List[str]] = None,
+    invitations: Optional[List[str]] = None,
+):
+    job = AttendanceBroadcastJob(id=uuid.uuid4().hex, event_id=event_id)
+    BROADCAST_JOBS[job.id] = job
+
+    task = asyncio.create_task(
+        run_attendance_broadcast(
+            job,
+            event_name=event_name,
+            data=data,
+            query=query,
+            present=present,
+            occupations=occupations,
+            invitations=invitations,
+        )
+    )
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_tasks.discard)
+    return AttendanceBroadcastRead(**job.model_dump())
+
+
+async def get_attendance_broadcast(session: AsyncSession, event_id: str, job_id: str):
+    job = BROADCAST_JOBS.get(job_id)
+    if job is not None and str(job.event_id) != str(event_id):
+        raise HTTPException(404, detail="Broadcast not found")
+    try:
+        db_results = await session.execute(
+            select(SmsOutbox.status, func.count())
+            .where(SmsOutbox.broadcast_id == job_id)
+            .group_by(SmsOutbox.status)
+        )
+        counts = dict(db_results.all())
+    except SQLAlchemyError:
+        logger.error(f"Unable to count SMS of broadcast {job_id}", exc_info=True)
+        raise HTTPException(500, detail="Something went wrong")
+    if job is None:
+        # Jobs only live in memory; fall back to the outbox once they expire.
+        if not counts:
+            raise HTTPException(404, detail="Broadcast not found")
+        job = AttendanceBroadcastJob(
+            id=job_id,
+            event_id=event_id,
+            status=AttendanceBroadcastStatus.completed,
+            recipients=sum(counts.values()),
+        )
+    return AttendanceBroadcastRead(
+        **job.model_dump(),
+        sent=counts.get(SmsStatus.sent.value, 0),
+        pending=counts.get(SmsStatus.pending.value, 0)
+        + counts.get(SmsStatus.sending.value, 0),
+        failed=counts.get(SmsStatus.failed.value, 0),
+    )
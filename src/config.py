@@ -30,7 +30,39 @@ class Settings(BaseSettings):
     verification_token_secret: str
     db_url: str
     arkesel_url: str = "https://sms.arkesel.com/api/v2/sms/send"
+    arkesel_template_url: str = "https://sms.arkesel.com/api/v2/sms/template/send"
     arkesel_api_key: str
+    export_workers: int = 2
+    export_file_ttl: int = 300
+    export_cleanup_interval: int = 60
+    attendance_archive_after_days: int = 90
+    attendance_archive_interval: int = 3600
+    roster_sync_overlap_seconds: int = 60
+    rsvp_batching: bool = False
+    rsvp_batch_size: int = 200
+    rsvp_batch_interval_ms: int = 20
+    event_cache_ttl: float = 60
+    event_cache_maxsize: int = 1024
+    event_search_index_ttl: float = 300
+    event_search_max_results: int = 1000
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30
+    http_timeout: float = 10
+    http_connect_timeout: float = 5
+    http_retries: int = 2
+    http_retry_backoff: float = 0.5
+    sms_circuit_failure_threshold: int = 5
+    sms_circuit_reset_seconds: float = 60
+    sms_dispatch_interval: float = 5
+    sms_batch_size: int = 500
+    sms_dispatch_concurrency: int = 8
+    sms_broadcast_chunk_size: int = 500
+    sms_recipient_limit: int = 100
+    sms_max_attempts: int = 5
+    sms_retry_base_seconds: int = 30
+    sms_retry_max_seconds: int = 3600
+    sms_claim_timeout: int = 300
     # jwt_expire_time: int
     # algorithm: str
     # google_client_id: str
@@ -1,6 +1,7 @@
 from typing import AsyncGenerator
 
 from config import get_logger, get_settings
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -8,6 +9,18 @@ settings = get_settings()
 logger = get_logger()
 engine = create_async_engine(settings.db_url, future=True, echo=False)
 
+if engine.dialect.name == "mysql":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_fulltext_stopwords(dbapi_connection, connection_record):
+        # The ngram parser drops every token containing a stopword ("a", "i",
+        # ...), which hides most two letter name fragments from FULLTEXT
+        # searches. Indexes created and queried on these connections skip the
+        # stopword list.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        cursor.close()
+
 async_session_maker = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=True
 )
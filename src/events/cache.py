@@ -0,0 +1,10 @@
+from cache import TTLCache
+from config import get_settings
+
+settings = get_settings()
+
+# Public catalog reads (listings and event details). Cleared on every event,
+# image or organiser write; the TTL bounds staleness across worker processes.
+event_catalog_cache = TTLCache(
+    ttl=settings.event_cache_ttl, maxsize=settings.event_cache_maxsize
+)
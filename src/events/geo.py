@@ -0,0 +1,98 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+KM_PER_DEGREE = 111.32
+
+
+def parse_coordinate(value: Optional[str], limit: float) -> Optional[float]:
+    try:
+        coordinate = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(coordinate) or abs(coordinate) > limit:
+        return None
+    return coordinate
+
+
+def encode_geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        value, bounds = (lng, lng_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell of ``precision`` chars."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def search_precision(lat: float, radius_km: float) -> int:
+    """Longest geohash whose cells are still at least ``radius_km`` across.
+
+    The circle around a point then always fits inside the 3x3 block of cells
+    centred on that point's cell.
+    """
+    longitude_scale = max(math.cos(math.radians(lat)), 0.01)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision)
+        if (
+            height * KM_PER_DEGREE >= radius_km
+            and width * KM_PER_DEGREE * longitude_scale >= radius_km
+        ):
+            return precision
+    return 0
+
+
+def geohash_search_cells(lat: float, lng: float, radius_km: float) -> List[str]:
+    """Geohash prefixes covering every point within ``radius_km`` of a point."""
+    precision = search_precision(lat, radius_km)
+    if precision == 0:
+        return [""]
+    height, width = geohash_cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        cell_lat = lat + lat_step * height
+        if abs(cell_lat) > 90:
+            continue
+        for lng_step in (-1, 0, 1):
+            cell_lng = (lng + lng_step * width + 180) % 360 - 180
+            cells.add(encode_geohash(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+
+def haversine_km(
+    lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray
+) -> np.ndarray:
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
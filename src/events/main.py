@@ -1,3 +1,4 @@
+import uuid
 from typing import List, Optional
 
 from admins.main import get_current_active_user
@@ -7,21 +8,24 @@ from fastapi import Depends, FastAPI
 from fastapi_pagination import add_pagination
 from fastapi_pagination.links import Page
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils import json_bytes_response
 
 from .schemas import (
     EventCreate,
-    EventImagesCreate,
+    EventImagesRead,
     EventListingRead,
     EventRead,
     EventUpdate,
 )
 from .services import (
-    create_event_images,
+    add_event_images,
     create_new_organisation_event,
-    delete_event_image,
+    delete_event_images,
     delete_organiser_event,
     get_event_by_id,
     get_organisation_events,
+    get_organisation_events_listing,
+    reorder_event_images,
     update_organisation_event,
 )
 
@@ -34,9 +38,10 @@ async def get_organiser_events_mini(
     session: AsyncSession = Depends(get_async_session),
     admin: Admins = Depends(get_current_active_user),  # noqa: F821
 ):
-    return await get_organisation_events(
+    page = await get_organisation_events_listing(
         session=session, organiser_id=admin.organiser_id, query=query
     )
+    return json_bytes_response(page)
 
 
 @event_app.get("/", response_model=Page[EventRead])
@@ -95,26 +100,49 @@ async def get_event(
     )
 
 
-@event_app.post("/{event_id}")
+@event_app.post("/{event_id}", response_model=List[EventImagesRead])
 async def add_new_images_to_event(
     event_id: str,
     images: List[str],
     session: AsyncSession = Depends(get_async_session),
     admin: Admins = Depends(get_current_active_user),
 ):
-    event_images = [EventImagesCreate(url=image) for image in images]
-    return await create_event_images(
-        session=session, images=event_images, event_id=event_id, commit=True
+    return await add_event_images(
+        session=session,
+        event_id=event_id,
+        organiser_id=admin.organiser_id,
+        urls=images,
     )
 
 
-@event_app.delete("/{event_id}/images")
+@event_app.delete("/{event_id}/images", response_model=List[EventImagesRead])
 async def delete_images(
-    images: List[str],
+    event_id: str,
+    images: List[uuid.UUID],
     session: AsyncSession = Depends(get_async_session),
     admin: Admins = Depends(get_current_active_user),
 ):
-    return await delete_event_image(session=session, image_ids=images)
+    return await delete_event_images(
+        session=session,
+        event_id=event_id,
+        organiser_id=admin.organiser_id,
+        image_ids=images,
+    )
+
+
+@event_app.put("/{event_id}/images/order", response_model=List[EventImagesRead])
+async def reorder_images(
+    event_id: str,
+    images: List[uuid.UUID],
+    session: AsyncSession = Depends(get_async_session),
+    admin: Admins = Depends(get_current_active_user),
+):
+    return await reorder_event_images(
+        session=session,
+        event_id=event_id,
+        organiser_id=admin.organiser_id,
+        image_ids=images,
+    )
 
 
 add_pagination(event_app)
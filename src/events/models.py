@@ -3,16 +3,37 @@ from datetime import datetime
 
 from database import Base
 from fastapi_users_db_sqlalchemy.generics import GUID
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+    inspect,
+    select,
+)
 from sqlalchemy.orm import relationship
 
+from .geo import encode_geohash, parse_coordinate
+from .search import build_event_search_text
+
 
 class EventImages(Base):
     __tablename__ = "event_images"
+    __table_args__ = (
+        Index("ix_event_images_event_id_position", "event_id", "position"),
+    )
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     event_id = Column(GUID, ForeignKey("events.id"))
-    event = relationship("Events", back_populates="images", lazy="selectin")
+    event = relationship("Events", back_populates="images", lazy="raise")
     url = Column(String(300), nullable=False)
+    position = Column(Integer, nullable=False, default=0)
     createdAt = Column(DateTime, nullable=True, default=datetime.utcnow)
     updatedAt = Column(
         DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -21,6 +42,12 @@ class EventImages(Base):
 
 class Events(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_published_start_date", "published", "start_date"),
+        Index(
+            "ix_events_search_text", "search_text", mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     name = Column(String(length=100))
     summary = Column(String(length=500))
@@ -31,10 +58,21 @@ class Events(Base):
     address = Column(String(300))
     longitude = Column(String(40))
     latitude = Column(String(40))
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True, index=True)
     published = Column(Boolean, default=False)
-    images = relationship("EventImages", back_populates="event", lazy="selectin")
+    search_text = Column(Text, nullable=True)
+    attendanceArchivedAt = Column(DateTime, nullable=True)
+    # Relations are never loaded implicitly; queries opt in with loader options.
+    images = relationship(
+        "EventImages",
+        back_populates="event",
+        lazy="raise",
+        order_by="[EventImages.position, EventImages.createdAt]",
+    )
     organiser_id = Column(GUID, ForeignKey("organisers.id"))
-    organiser = relationship("Organisers", back_populates="events", lazy="selectin")
+    organiser = relationship("Organisers", back_populates="events", lazy="raise")
     attendance = relationship(
         "EventAttendance", back_populates="event", cascade="all, delete-orphan"
     )
@@ -44,4 +82,37 @@ class Events(Base):
     )
 
 
+@event.listens_for(Events, "before_insert")
+@event.listens_for(Events, "before_update")
+def set_coordinates(mapper, connection, target: Events):
+    target.lat = parse_coordinate(target.latitude, 90)
+    target.lng = parse_coordinate(target.longitude, 180)
+    target.geohash = (
+        encode_geohash(target.lat, target.lng)
+        if target.lat is not None and target.lng is not None
+        else None
+    )
+
+
+SEARCH_TEXT_ATTRIBUTES = ("name", "summary", "description", "organiser_id")
+
+
+@event.listens_for(Events, "before_insert")
+@event.listens_for(Events, "before_update")
+def set_search_text(mapper, connection, target: Events):
+    # Skip the organiser lookup for updates that leave the searchable text alone.
+    state = inspect(target)
+    if state.persistent and not any(
+        getattr(state.attrs, attribute).history.has_changes()
+        for attribute in SEARCH_TEXT_ATTRIBUTES
+    ):
+        return
+    organiser_name = connection.scalar(
+        select(Organisers.name).where(Organisers.id == target.organiser_id)
+    )
+    target.search_text = build_event_search_text(
+        target.name, target.summary, target.description, organiser_name
+    )
+
+
 from admins.models import Organisers
@@ -25,6 +25,21 @@ class EventListingRead(BaseModel):
     organiser: OrganiserRead
 
 
+class EventNearbyRead(EventListingRead):
+    distance_km: float
+
+
+class EventCalendarDay(BaseModel):
+    day: date
+    count: int
+    events: List[EventListingRead]
+
+
+class EventCalendar(BaseModel):
+    month: str
+    days: List[EventCalendarDay] = []
+
+
 class EventReadWithOrganiser(BaseModel):
     id: models.ID
     name: str
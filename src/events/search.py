@@ -0,0 +1,142 @@
+import bisect
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Share of the score a term gets when it only matches the typed prefix.
+PREFIX_MATCH_WEIGHT = 0.5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def build_event_search_text(*values: Optional[str]) -> str:
+    return " ".join(token for value in values for token in tokenize(value))
+
+
+class EventSearchIndex:
+    """In-process inverted index over ``Events.search_text`` with BM25 ranking.
+
+    Used where MySQL FULLTEXT is not available. Every query term must match;
+    the last term also matches as a prefix so typeahead works, scored at
+    ``PREFIX_MATCH_WEIGHT`` so whole-word hits rank first. The index is rebuilt
+    from the database after ``ttl`` seconds so writes made by other worker
+    processes show up, and is updated in place by this process's writes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.built_at: Optional[float] = None
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Tuple[str, bool, List[str]]] = {}
+        self.terms: Optional[List[str]] = None
+
+    @property
+    def stale(self) -> bool:
+        return self.built_at is None or time.monotonic() - self.built_at > self.ttl
+
+    def invalidate(self):
+        self.built_at = None
+
+    def build(self, rows: Iterable[Tuple[str, str, bool, Optional[str]]]):
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        self.documents = {}
+        for event_id, organiser_id, published, search_text in rows:
+            self.add(event_id, organiser_id, published, search_text)
+        self.built_at = time.monotonic()
+
+    def add(
+        self,
+        event_id: str,
+        organiser_id: str,
+        published: bool,
+        search_text: Optional[str],
+    ):
+        event_id = str(event_id)
+        self.remove(event_id)
+        tokens = tokenize(search_text)
+        for token, frequency in Counter(tokens).items():
+            self.postings[token][event_id] = frequency
+        self.lengths[event_id] = len(tokens)
+        self.documents[event_id] = (str(organiser_id), bool(published), tokens)
+        self.terms = None
+
+    def remove(self, event_id: str):
+        document = self.documents.pop(str(event_id), None)
+        if document is None:
+            return
+        self.lengths.pop(str(event_id), None)
+        for token in set(document[2]):
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(str(event_id), None)
+                if not postings:
+                    del self.postings[token]
+        self.terms = None
+
+    def expand(self, prefix: str) -> List[str]:
+        if self.terms is None:
+            self.terms = sorted(self.postings)
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + "\uffff")
+        return self.terms[start:end]
+
+    def search(
+        self,
+        query: str,
+        organiser_id: Optional[str] = None,
+        published: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        tokens = tokenize(query)
+        if not tokens or not self.documents:
+            return []
+        total = len(self.documents)
+        average_length = sum(self.lengths.values()) / total or 1
+
+        scores: Optional[Dict[str, float]] = None
+        for position, token in enumerate(tokens):
+            is_last = position == len(tokens) - 1
+            terms = self.expand(token) if is_last else [token]
+            token_scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self.postings.get(term, {})
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for event_id, frequency in postings.items():
+                    norm = 1 - BM25_B + BM25_B * self.lengths[event_id] / average_length
+                    score = idf * frequency * (BM25_K1 + 1) / (
+                        frequency + BM25_K1 * norm
+                    )
+                    if term != token:
+                        score *= PREFIX_MATCH_WEIGHT
+                    token_scores[event_id] = max(token_scores.get(event_id, 0), score)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    event_id: score + token_scores[event_id]
+                    for event_id, score in scores.items()
+                    if event_id in token_scores
+                }
+            if not scores:
+                return []
+
+        results = [
+            (event_id, score)
+            for event_id, score in scores.items()
+            if (
+                organiser_id is None
+                or self.documents[event_id][0] == str(organiser_id)
+            )
+            and (published is None or self.documents[event_id][1] == published)
+        ]
+        results.sort(key=lambda result: (-result[1], result[0]))
+        return results[:limit] if limit else results
@@ -1,16 +1,133 @@
+import uuid
 from typing import List, Optional
 
+from admins.models import Organisers
+from config import get_settings
+from database import engine
+from attendance.models import EventAttendance, EventAttendanceArchive
 from events.models import Events
 from fastapi import HTTPException
 from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import select
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Select,
+    bindparam,
+    case,
+    delete,
+    false,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.mysql import match as mysql_match
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import remove_none
+from sqlalchemy.orm import joinedload, selectinload
 
+from .cache import event_catalog_cache
 from .models import EventImages
-from .schemas import EventCreate
-from .schemas import EventImagesCreate as EventImageSchema
+from .schemas import EventCreate, EventListingRead
+from .search import EventSearchIndex, build_event_search_text, tokenize
+
+settings = get_settings()
+
+MYSQL_FULLTEXT_MIN_TOKEN = 3
+event_search_index = EventSearchIndex(ttl=settings.event_search_index_ttl)
+
+
+async def rank_events(
+    session: AsyncSession,
+    query: str,
+    organiser_id: Optional[str] = None,
+    published: Optional[bool] = None,
+):
+    if event_search_index.stale:
+        db_results = await session.execute(
+            select(Events.id, Events.organiser_id, Events.published, Events.search_text)
+        )
+        event_search_index.build(db_results.all())
+    return event_search_index.search(
+        query,
+        organiser_id=organiser_id,
+        published=published,
+        limit=settings.event_search_max_results,
+    )
+
+
+async def search_events(
+    session: AsyncSession,
+    statement: Select,
+    query: Optional[str],
+    organiser_id: Optional[str] = None,
+    published: Optional[bool] = None,
+) -> Select:
+    """Restrict ``statement`` to events matching ``query``, best match first.
+
+    Matches name, summary, description and organiser name through
+    ``Events.search_text``. Uses the FULLTEXT index on MySQL and the
+    in-process BM25 index elsewhere, or for terms shorter than MySQL's
+    minimum token size. The last term is matched as a prefix.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return statement
+
+    if engine.dialect.name == "mysql" and all(
+        len(token) >= MYSQL_FULLTEXT_MIN_TOKEN for token in tokens
+    ):
+        terms = [f"+{token}" for token in tokens]
+        terms[-1] += "*"
+        relevance = mysql_match(
+            Events.search_text, against=" ".join(terms)
+        ).in_boolean_mode()
+        return statement.where(relevance).order_by(relevance.desc(), Events.id)
+
+    ranked = await rank_events(
+        session=session, query=query, organiser_id=organiser_id, published=published
+    )
+    if not ranked:
+        return statement.where(false())
+    event_ids = [event_id for event_id, _ in ranked]
+    return statement.where(Events.id.in_(event_ids)).order_by(
+        case({event_id: rank for rank, event_id in enumerate(event_ids)}, value=Events.id)
+    )
+
+
+def index_event(event: Events):
+    if not event_search_index.stale:
+        event_search_index.add(
+            event.id, event.organiser_id, event.published, event.search_text
+        )
+
+
+async def refresh_organiser_events_search_text(
+    session: AsyncSession, organiser_id: str, organiser_name: Optional[str]
+):
+    db_results = await session.execute(
+        select(Events.id, Events.name, Events.summary, Events.description).where(
+            Events.organiser_id == organiser_id
+        )
+    )
+    rows = [
+        {
+            "event_id": row.id,
+            "search_text": build_event_search_text(
+                row.name, row.summary, row.description, organiser_name
+            ),
+        }
+        for row in db_results.all()
+    ]
+    if rows:
+        table = Events.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("event_id"))
+            .values(search_text=bindparam("search_text")),
+            rows,
+        )
+        await session.commit()
+    event_search_index.invalidate()
 
 
 async def get_organisation_events(
@@ -19,61 +136,204 @@ async def get_organisation_events(
     query: Optional[str],
 ):
     try:
-        return await paginate(
-            conn=session,
-            query=select(Events)
-            .where(Events.organiser_id == organiser_id)
-            .where(Events.name.ilike(f"%{query}%")),
+        statement = await search_events(
+            session=session,
+            statement=select(Events)
+            .options(selectinload(Events.images))
+            .where(Events.organiser_id == organiser_id),
+            query=query,
+            organiser_id=organiser_id,
         )
+        return await paginate(conn=session, query=statement)
     except SQLAlchemyError:
         raise HTTPException(500, detail="Something went wrong")
 
 
-async def create_event_images(
+LISTING_COLUMNS = [
+    getattr(Events, column)
+    for column in EventListingRead.model_fields
+    if column != "organiser"
+]
+ORGANISER_COLUMNS = [
+    Organisers.id,
+    Organisers.name,
+    Organisers.followers_count,
+    Organisers.summary,
+    Organisers.description,
+    Organisers.logo,
+]
+event_listing_adapter = TypeAdapter(List[EventListingRead])
+
+
+def event_listing_statement() -> Select:
+    """Select only the columns ``EventListingRead`` needs, organiser included."""
+    return select(
+        *LISTING_COLUMNS,
+        *[column.label(f"organiser_{column.key}") for column in ORGANISER_COLUMNS],
+    ).join(Events.organiser)
+
+
+def rows_to_event_listings(rows) -> List[EventListingRead]:
+    listings = []
+    for row in rows:
+        listing = row._asdict()
+        listing["organiser"] = {
+            column.key: listing.pop(f"organiser_{column.key}")
+            for column in ORGANISER_COLUMNS
+        }
+        listings.append(listing)
+    return event_listing_adapter.validate_python(listings)
+
+
+async def get_organisation_events_listing(
     session: AsyncSession,
-    images: List[EventImageSchema],
-    event: Optional[Events] = None,
-    event_id: Optional[str] = None,
-    commit: Optional[bool] = False,
+    organiser_id: str,
+    query: Optional[str],
 ):
-    extra_params = remove_none({"event_id": event_id, "event": event})
-    for image in images:
-        new_image = EventImages(url=image.url, **extra_params)
-        if not commit:
-            session.flush(new_image)
-        else:
-            session.add(new_image)
-
-    if commit:
-        await session.commit()
-    return True
+    try:
+        statement = await search_events(
+            session=session,
+            statement=event_listing_statement().where(
+                Events.organiser_id == organiser_id
+            ),
+            query=query,
+            organiser_id=organiser_id,
+        )
+        return await paginate(
+            conn=session, query=statement, transformer=rows_to_event_listings
+        )
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
 
 
-async def delete_event_image(
-    session: AsyncSession,
-    image_ids: List[str],
+async def check_organiser_event(
+    session: AsyncSession, event_id: str, organiser_id: str
+):
+    try:
+        found = await session.scalar(
+            select(Events.id).where(
+                Events.id == event_id, Events.organiser_id == organiser_id
+            )
+        )
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+    if found is None:
+        raise HTTPException(404, detail="Event not found")
+
+
+async def get_event_images(session: AsyncSession, event_id: str) -> List[EventImages]:
+    db_results = await session.execute(
+        select(EventImages)
+        .where(EventImages.event_id == event_id)
+        .order_by(EventImages.position, EventImages.createdAt)
+    )
+    return db_results.scalars().all()
+
+
+async def add_event_images(
+    session: AsyncSession, event_id: str, organiser_id: str, urls: List[str]
+):
+    """Append images after the event's current last position in one INSERT."""
+    await check_organiser_event(
+        session=session, event_id=event_id, organiser_id=organiser_id
+    )
+    try:
+        if urls:
+            last_position = await session.scalar(
+                select(func.max(EventImages.position)).where(
+                    EventImages.event_id == event_id
+                )
+            )
+            start = 0 if last_position is None else last_position + 1
+            await session.execute(
+                insert(EventImages),
+                [
+                    {"event_id": event_id, "url": url, "position": start + index}
+                    for index, url in enumerate(urls)
+                ],
+            )
+            await session.commit()
+            event_catalog_cache.clear()
+        return await get_event_images(session=session, event_id=event_id)
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(500, detail="Something went wrong")
+
+
+async def delete_event_images(
+    session: AsyncSession, event_id: str, organiser_id: str, image_ids: List[uuid.UUID]
+):
+    await check_organiser_event(
+        session=session, event_id=event_id, organiser_id=organiser_id
+    )
+    try:
+        if image_ids:
+            await session.execute(
+                delete(EventImages).where(
+                    EventImages.event_id == event_id, EventImages.id.in_(image_ids)
+                )
+            )
+            await session.commit()
+            event_catalog_cache.clear()
+        return await get_event_images(session=session, event_id=event_id)
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(500, detail="Something went wrong")
+
+
+async def reorder_event_images(
+    session: AsyncSession, event_id: str, organiser_id: str, image_ids: List[uuid.UUID]
 ):
-    for id in image_ids:
-        db_image = await session.execute(
-            select(EventImages).where(EventImages.id == id)
+    """Give the listed images positions in the given order.
+
+    Images of the event that are not listed keep their relative order after
+    the listed ones.
+    """
+    await check_organiser_event(
+        session=session, event_id=event_id, organiser_id=organiser_id
+    )
+    ordered = list(dict.fromkeys(image_ids))
+    try:
+        current = await get_event_images(session=session, event_id=event_id)
+        listed = set(ordered)
+        ordered += [image.id for image in current if image.id not in listed]
+        table = EventImages.__table__
+        await session.execute(
+            update(table)
+            .where(
+                table.c.id == bindparam("image_id"), table.c.event_id == event_id
+            )
+            .values(position=bindparam("new_position")),
+            [
+                {"image_id": image_id, "new_position": position}
+                for position, image_id in enumerate(ordered)
+            ],
         )
-        image = db_image.scalar_one_or_none()
-        if image:
-            await session.delete(image)
-    await session.commit()
-    return True
+        await session.commit()
+        event_catalog_cache.clear()
+        return await get_event_images(session=session, event_id=event_id)
+    except SQLAlchemyError:
+        await session.rollback()
+        raise HTTPException(500, detail="Something went wrong")
 
 
 async def create_new_organisation_event(
     session: AsyncSession, data: EventCreate, organiser_id: str
 ):
-    images = data.images
-    data_dict = data.model_dump()
-    data_dict.pop("images")
-    new_event = Events(**data_dict, organiser_id=organiser_id)
-    await create_event_images(session=session, images=images, event=new_event)
+    data_dict = data.model_dump(exclude={"images"})
+    # Always set the collection so the response never lazy loads images.
+    new_event = Events(
+        **data_dict,
+        organiser_id=organiser_id,
+        images=[
+            EventImages(url=image.url, position=position)
+            for position, image in enumerate(data.images or [])
+        ],
+    )
     session.add(new_event)
     await session.commit()
+    event_catalog_cache.clear()
+    index_event(new_event)
     return new_event
 
 
@@ -88,15 +348,17 @@ async def update_organisation_event(
         setattr(event, key, value)
 
     await session.commit()
+    event_catalog_cache.clear()
+    index_event(event)
     return event
 
 
 async def get_event_by_id(session: AsyncSession, event_id: str, organiser_id: str):
     try:
         db_result = await session.execute(
-            select(Events).where(
-                Events.id == event_id, Events.organiser_id == organiser_id
-            )
+            select(Events)
+            .options(selectinload(Events.images))
+            .where(Events.id == event_id, Events.organiser_id == organiser_id)
         )
         event = db_result.scalar_one_or_none()
         if event is None:
@@ -112,8 +374,19 @@ async def delete_organiser_event(
     event = await get_event_by_id(
         event_id=event_id, organiser_id=organiser_id, session=session
     )
+    # Remove attendance set-based instead of loading it through the cascade.
+    await session.execute(
+        delete(EventAttendance).where(EventAttendance.event_id == event.id)
+    )
+    await session.execute(
+        delete(EventAttendanceArchive).where(
+            EventAttendanceArchive.event_id == event.id
+        )
+    )
     await session.delete(event)
     await session.commit()
+    event_catalog_cache.clear()
+    event_search_index.remove(event.id)
     return True
 
 
@@ -124,7 +397,9 @@ async def user_get_all_events(
     try:
         return await paginate(
             conn=session,
-            query=select(Events).where(Events.name.ilike(f"%{query}%")),
+            query=select(Events)
+            .options(selectinload(Events.images))
+            .where(Events.name.ilike(f"%{query}%")),
         )
     except SQLAlchemyError:
         raise HTTPException(500, detail="Something went wrong")
@@ -132,7 +407,11 @@ async def user_get_all_events(
 
 async def user_get_event_by_id(session: AsyncSession, event_id: str):
     try:
-        db_result = await session.execute(select(Events).where(Events.id == event_id))
+        db_result = await session.execute(
+            select(Events)
+            .options(selectinload(Events.images), joinedload(Events.organiser))
+            .where(Events.id == event_id)
+        )
         event = db_result.scalar_one_or_none()
         if event is None:
             raise HTTPException(404, detail="Event not found")
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+from config import get_logger, get_settings
+
+settings = get_settings()
+logger = get_logger()
+
+RETRY_STATUS_CODES = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stop calling a failing provider for ``reset_timeout`` seconds.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are refused. Once the timeout passes a single trial call is let
+    through; its outcome closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        return (
+            self.opened_at is not None
+            and time.monotonic() - self.opened_at < self.reset_timeout
+        )
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return False
+        if self.trial_running:
+            return False
+        self.trial_running = True
+        return True
+
+    def end_trial(self):
+        self.trial_running = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit {self.name} opened")
+            self.opened_at = time.monotonic()
+
+
+class OutboundClient:
+    """App-wide pooled HTTP client for third party integrations.
+
+    Started and closed by ``main.lifespan`` so every outbound call reuses the
+    same keep-alive connections. Connection failures are retried by the
+    transport and 429/503 responses with backoff; anything else is returned to
+    the caller as is, so non-idempotent posts are never sent twice.
+    """
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    settings.http_timeout, connect=settings.http_connect_timeout
+                ),
+                transport=httpx.AsyncHTTPTransport(retries=settings.http_retries),
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        breaker: Optional[CircuitBreaker] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit {breaker.name} is open")
+        is_trial = breaker is not None and breaker.trial_running
+        # Lazily create the client outside the app lifespan (scripts, Mangum).
+        self.start()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    # Connect failures were already retried by the transport.
+                    if breaker is not None:
+                        breaker.record_failure()
+                    raise
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+                if attempt >= settings.http_retries:
+                    break
+                attempt += 1
+                await asyncio.sleep(settings.http_retry_backoff * 2 ** (attempt - 1))
+
+            if breaker is not None:
+                if response.status_code >= 500 or response.status_code == 429:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            return response
+        finally:
+            # A trial that was cancelled or raised must not keep the circuit
+            # refusing every later call.
+            if is_trial:
+                breaker.end_trial()
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+
+http_client = OutboundClient()
+sms_breaker = CircuitBreaker(
+    "sms",
+    failure_threshold=settings.sms_circuit_failure_threshold,
+    reset_timeout=settings.sms_circuit_reset_seconds,
+)
@@ -1,21 +1,55 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
 from admins.main import admins_app
+from attendance.buffer import rsvp_buffer
+from attendance.counters import attendance_counters
 from attendance.main import attendance_app
-from database import create_db_tables, delete_db_tables
+from attendance.services import (
+    archive_past_events_attendance,
+    expire_attendance_exports,
+    shutdown_export_pool,
+)
+from config import get_settings
+from database import async_session_maker, create_db_tables, delete_db_tables
 from events.main import event_app
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_pagination import add_pagination
+from http_client import http_client
 from mangum import Mangum
+from notifications.services import sms_dispatcher
 from users.main import users_app
+from utils import run_periodically
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_db_tables()
+    http_client.start()
+    async with async_session_maker() as session:
+        await attendance_counters.seed(session)
+    cleanup_task = asyncio.create_task(
+        run_periodically(expire_attendance_exports, settings.export_cleanup_interval)
+    )
+    archive_task = asyncio.create_task(
+        run_periodically(
+            archive_past_events_attendance, settings.attendance_archive_interval
+        )
+    )
+    if settings.rsvp_batching:
+        rsvp_buffer.start()
+    sms_dispatcher.start()
     yield
+    await rsvp_buffer.stop()
+    await sms_dispatcher.stop()
+    await http_client.close()
+    cleanup_task.cancel()
+    archive_task.cancel()
+    shutdown_export_pool()
     # await delete_db_tables()
 
 
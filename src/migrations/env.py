@@ -7,6 +7,7 @@ from users.models import User
 from attendance.models import EventAttendance
 from admins.models import Organisers, Admins
 from events.models import EventImages, Events
+from notifications.models import SmsOutbox
 # from namesCounter import models
 from config import get_settings
 from sqlalchemy import pool
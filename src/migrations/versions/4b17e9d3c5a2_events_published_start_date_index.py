@@ -0,0 +1,27 @@
+"""Added (published, start_date) index on events
+
+Revision ID: 4b17e9d3c5a2
+Revises: d82f4c6a0e19
+Create Date: 2026-10-18 14:58:41.339027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b17e9d3c5a2'
+down_revision: Union[str, None] = 'd82f4c6a0e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_events_published_start_date', 'events', ['published', 'start_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_published_start_date', table_name='events')
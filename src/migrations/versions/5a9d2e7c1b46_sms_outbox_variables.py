@@ -0,0 +1,27 @@
+"""Added sms_outbox.variables for personalised messages
+
+Revision ID: 5a9d2e7c1b46
+Revises: 3e7b1c9d5f28
+Create Date: 2026-10-18 18:22:09.641375
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9d2e7c1b46'
+down_revision: Union[str, None] = '3e7b1c9d5f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sms_outbox', sa.Column('variables', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sms_outbox', 'variables')
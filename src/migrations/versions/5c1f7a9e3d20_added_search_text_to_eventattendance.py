@@ -0,0 +1,57 @@
+"""Added search_text column to EventAttendance
+
+Revision ID: 5c1f7a9e3d20
+Revises: 2b435e4b2bbe
+Create Date: 2026-10-18 10:05:12.418233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f7a9e3d20'
+down_revision: Union[str, None] = '2b435e4b2bbe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('event_attandance', sa.Column('search_text', sa.String(length=400), nullable=True))
+
+    attendance = sa.table(
+        'event_attandance',
+        sa.column('email', sa.String),
+        sa.column('first_name', sa.String),
+        sa.column('last_name', sa.String),
+        sa.column('search_text', sa.String),
+    )
+    op.execute(
+        attendance.update().values(
+            search_text=sa.func.lower(
+                sa.func.coalesce(attendance.c.email, '')
+                + ' '
+                + sa.func.coalesce(attendance.c.first_name, '')
+                + ' '
+                + sa.func.coalesce(attendance.c.last_name, '')
+            )
+        )
+    )
+
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index(
+            'ix_event_attandance_search_text',
+            'event_attandance',
+            ['search_text'],
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram',
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_event_attandance_search_text', table_name='event_attandance')
+    op.drop_column('event_attandance', 'search_text')
@@ -0,0 +1,57 @@
+"""Added event_images.position
+
+Revision ID: 7e2a5d90c8f4
+Revises: 4b17e9d3c5a2
+Create Date: 2026-10-18 15:31:26.904518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2a5d90c8f4'
+down_revision: Union[str, None] = '4b17e9d3c5a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('event_images', sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+    # Existing images keep the order they were added in.
+    images = sa.table(
+        'event_images',
+        sa.column('id', sa.String),
+        sa.column('event_id', sa.String),
+        sa.column('position', sa.Integer),
+        sa.column('createdAt', sa.DateTime),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(images.c.id, images.c.event_id).order_by(
+            images.c.event_id, images.c.createdAt, images.c.id
+        )
+    )
+    positions = []
+    last_event_id, position = None, 0
+    for row in rows:
+        position = position + 1 if row.event_id == last_event_id else 0
+        last_event_id = row.event_id
+        if position:
+            positions.append({'image_id': row.id, 'new_position': position})
+    if positions:
+        bind.execute(
+            images.update()
+            .where(images.c.id == sa.bindparam('image_id'))
+            .values(position=sa.bindparam('new_position')),
+            positions,
+        )
+    op.create_index('ix_event_images_event_id_position', 'event_images', ['event_id', 'position'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_images_event_id_position', table_name='event_images')
+    op.drop_column('event_images', 'position')
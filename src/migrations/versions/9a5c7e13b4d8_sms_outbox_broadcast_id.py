@@ -0,0 +1,29 @@
+"""Added sms_outbox.broadcast_id
+
+Revision ID: 9a5c7e13b4d8
+Revises: 6d3b8f41e2a7
+Create Date: 2026-10-18 13:31:47.208355
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5c7e13b4d8'
+down_revision: Union[str, None] = '6d3b8f41e2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sms_outbox', sa.Column('broadcast_id', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_sms_outbox_broadcast_id'), 'sms_outbox', ['broadcast_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sms_outbox_broadcast_id'), table_name='sms_outbox')
+    op.drop_column('sms_outbox', 'broadcast_id')
@@ -0,0 +1,60 @@
+"""Added event_attandance_archive and events.attendanceArchivedAt
+
+Revision ID: a4e8c2d61f05
+Revises: f1d27c8a6b93
+Create Date: 2026-10-18 12:05:12.417630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import fastapi_users_db_sqlalchemy
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e8c2d61f05'
+down_revision: Union[str, None] = 'f1d27c8a6b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_attandance_archive',
+    sa.Column('id', fastapi_users_db_sqlalchemy.generics.GUID(), nullable=False),
+    sa.Column('email', sa.String(length=320), nullable=False),
+    sa.Column('phone_number', sa.String(length=15), nullable=True),
+    sa.Column('first_name', sa.String(length=30), nullable=True),
+    sa.Column('last_name', sa.String(length=30), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=True),
+    sa.Column('present', sa.Boolean(), nullable=True),
+    sa.Column('checkedAt', sa.DateTime(), nullable=True),
+    sa.Column('occupation', sa.String(length=200), nullable=True),
+    sa.Column('level', sa.String(length=200), nullable=True),
+    sa.Column('school', sa.String(length=200), nullable=True),
+    sa.Column('profession', sa.String(length=200), nullable=True),
+    sa.Column('other', sa.String(length=200), nullable=True),
+    sa.Column('by_friend', sa.Boolean(), nullable=True),
+    sa.Column('by_member', sa.Boolean(), nullable=True),
+    sa.Column('via_whatsapp', sa.Boolean(), nullable=True),
+    sa.Column('via_instagram', sa.Boolean(), nullable=True),
+    sa.Column('first_time', sa.Boolean(), nullable=True),
+    sa.Column('friend_name', sa.String(length=200), nullable=True),
+    sa.Column('search_text', sa.String(length=400), nullable=True),
+    sa.Column('createdAt', sa.DateTime(), nullable=True),
+    sa.Column('updatedAt', sa.DateTime(), nullable=True),
+    sa.Column('event_id', fastapi_users_db_sqlalchemy.generics.GUID(), nullable=False),
+    sa.Column('archivedAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_event_attandance_archive_email'), 'event_attandance_archive', ['email'], unique=False)
+    op.create_index('ix_event_attandance_archive_event_id_first_name_id', 'event_attandance_archive', ['event_id', 'first_name', 'id'], unique=False)
+    op.add_column('events', sa.Column('attendanceArchivedAt', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('events', 'attendanceArchivedAt')
+    op.drop_index('ix_event_attandance_archive_event_id_first_name_id', table_name='event_attandance_archive')
+    op.drop_index(op.f('ix_event_attandance_archive_email'), table_name='event_attandance_archive')
+    op.drop_table('event_attandance_archive')
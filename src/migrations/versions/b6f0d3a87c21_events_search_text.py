@@ -0,0 +1,70 @@
+"""Added events.search_text with a FULLTEXT index on MySQL
+
+Revision ID: b6f0d3a87c21
+Revises: 7e2a5d90c8f4
+Create Date: 2026-10-18 16:12:55.180364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+from events.search import build_event_search_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f0d3a87c21'
+down_revision: Union[str, None] = '7e2a5d90c8f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('search_text', sa.Text(), nullable=True))
+
+    events = sa.table(
+        'events',
+        sa.column('id', sa.String),
+        sa.column('name', sa.String),
+        sa.column('summary', sa.String),
+        sa.column('description', sa.Text),
+        sa.column('organiser_id', sa.String),
+        sa.column('search_text', sa.Text),
+    )
+    organisers = sa.table(
+        'organisers',
+        sa.column('id', sa.String),
+        sa.column('name', sa.String),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            events.c.id,
+            events.c.name,
+            events.c.summary,
+            events.c.description,
+            organisers.c.name.label('organiser_name'),
+        ).select_from(
+            events.outerjoin(organisers, events.c.organiser_id == organisers.c.id)
+        )
+    ).all()
+    for row in rows:
+        op.execute(
+            events.update()
+            .where(events.c.id == row.id)
+            .values(
+                search_text=build_event_search_text(
+                    row.name, row.summary, row.description, row.organiser_name
+                )
+            )
+        )
+
+    if bind.dialect.name == 'mysql':
+        op.create_index('ix_events_search_text', 'events', ['search_text'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_events_search_text', table_name='events')
+    op.drop_column('events', 'search_text')
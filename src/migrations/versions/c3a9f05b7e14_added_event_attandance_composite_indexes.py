@@ -0,0 +1,33 @@
+"""Added composite indexes to event_attandance
+
+Revision ID: c3a9f05b7e14
+Revises: 8e4b6d2a91c7
+Create Date: 2026-10-18 10:58:03.512906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9f05b7e14'
+down_revision: Union[str, None] = '8e4b6d2a91c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_attandance_event_id_present', 'event_attandance', ['event_id', 'present'], unique=False)
+    op.create_index('ix_event_attandance_event_id_first_name_id', 'event_attandance', ['event_id', 'first_name', 'id'], unique=False)
+    op.create_index('ix_event_attandance_event_id_email', 'event_attandance', ['event_id', 'email'], unique=False)
+    op.create_index('ix_event_attandance_event_id_updatedAt', 'event_attandance', ['event_id', 'updatedAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_attandance_event_id_updatedAt', table_name='event_attandance')
+    op.drop_index('ix_event_attandance_event_id_email', table_name='event_attandance')
+    op.drop_index('ix_event_attandance_event_id_first_name_id', table_name='event_attandance')
+    op.drop_index('ix_event_attandance_event_id_present', table_name='event_attandance')
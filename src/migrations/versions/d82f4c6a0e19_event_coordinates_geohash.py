@@ -0,0 +1,60 @@
+"""Added numeric coordinates and geohash to events
+
+Revision ID: d82f4c6a0e19
+Revises: 9a5c7e13b4d8
+Create Date: 2026-10-18 14:22:10.671904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+from events.geo import encode_geohash, parse_coordinate
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd82f4c6a0e19'
+down_revision: Union[str, None] = '9a5c7e13b4d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('lat', sa.Float(), nullable=True))
+    op.add_column('events', sa.Column('lng', sa.Float(), nullable=True))
+    op.add_column('events', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index(op.f('ix_events_geohash'), 'events', ['geohash'], unique=False)
+
+    events = sa.table(
+        'events',
+        sa.column('id', sa.String),
+        sa.column('latitude', sa.String),
+        sa.column('longitude', sa.String),
+        sa.column('lat', sa.Float),
+        sa.column('lng', sa.Float),
+        sa.column('geohash', sa.String),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(events.c.id, events.c.latitude, events.c.longitude).where(
+            events.c.latitude.is_not(None), events.c.longitude.is_not(None)
+        )
+    ).all()
+    for row in rows:
+        lat = parse_coordinate(row.latitude, 90)
+        lng = parse_coordinate(row.longitude, 180)
+        if lat is None or lng is None:
+            continue
+        op.execute(
+            events.update()
+            .where(events.c.id == row.id)
+            .values(lat=lat, lng=lng, geohash=encode_geohash(lat, lng))
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_events_geohash'), table_name='events')
+    op.drop_column('events', 'geohash')
+    op.drop_column('events', 'lng')
+    op.drop_column('events', 'lat')
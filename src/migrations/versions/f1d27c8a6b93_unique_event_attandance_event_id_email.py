@@ -0,0 +1,82 @@
+"""Made (event_id, email) unique on event_attandance
+
+Revision ID: f1d27c8a6b93
+Revises: c3a9f05b7e14
+Create Date: 2026-10-18 11:20:36.884012
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from database import Base
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d27c8a6b93'
+down_revision: Union[str, None] = 'c3a9f05b7e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    attendance = sa.table(
+        'event_attandance',
+        sa.column('id', sa.String),
+        sa.column('event_id', sa.String),
+        sa.column('email', sa.String),
+        sa.column('present', sa.Boolean),
+        sa.column('checkedAt', sa.DateTime),
+        sa.column('createdAt', sa.DateTime),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            attendance.c.id,
+            attendance.c.event_id,
+            attendance.c.email,
+            attendance.c.present,
+            attendance.c.checkedAt,
+        ).order_by(
+            attendance.c.event_id, attendance.c.createdAt, attendance.c.id
+        )
+    )
+    # MySQL's default collation compares emails case-insensitively, so group
+    # the same way the unique index will. Keep the earliest registration and
+    # carry over the check-in of any dropped duplicate.
+    kept = {}
+    duplicate_ids = []
+    for row in rows:
+        key = (row.event_id, (row.email or '').strip().lower())
+        if key not in kept:
+            kept[key] = {'id': row.id, 'present': row.present, 'checkedAt': row.checkedAt, 'merged': False}
+            continue
+        duplicate_ids.append(row.id)
+        keep = kept[key]
+        keep['merged'] = True
+        if row.present:
+            keep['present'] = True
+        if row.checkedAt is not None and (
+            keep['checkedAt'] is None or row.checkedAt > keep['checkedAt']
+        ):
+            keep['checkedAt'] = row.checkedAt
+
+    for keep in kept.values():
+        if keep['merged']:
+            op.execute(
+                attendance.update()
+                .where(attendance.c.id == keep['id'])
+                .values(present=keep['present'], checkedAt=keep['checkedAt'])
+            )
+    for start in range(0, len(duplicate_ids), 500):
+        op.execute(
+            attendance.delete().where(attendance.c.id.in_(duplicate_ids[start:start + 500]))
+        )
+
+    op.drop_index('ix_event_attandance_event_id_email', table_name='event_attandance')
+    op.create_index('ix_event_attandance_event_id_email', 'event_attandance', ['event_id', 'email'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_attandance_event_id_email', table_name='event_attandance')
+    op.create_index('ix_event_attandance_event_id_email', 'event_attandance', ['event_id', 'email'], unique=False)
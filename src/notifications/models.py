@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+
+from database import Base
+from fastapi_users_db_sqlalchemy.generics import GUID
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+
+from .schemas import SmsStatus
+
+
+class SmsOutbox(Base):
+    __tablename__ = "sms_outbox"
+    __table_args__ = (
+        Index("ix_sms_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    phone_number = Column(String(length=15), nullable=False)
+    sender_id = Column(String(length=11), nullable=False)
+    message = Column(Text, nullable=False)
+    # Per recipient values for the <%placeholders%> of a personalised message.
+    variables = Column(JSON, nullable=True)
+    broadcast_id = Column(String(length=32), nullable=True, index=True)
+    status = Column(String(length=10), nullable=False, default=SmsStatus.pending.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+    provider_message_id = Column(String(length=100), nullable=True)
+    last_error = Column(String(length=500), nullable=True)
+    sentAt = Column(DateTime, nullable=True)
+    createdAt = Column(DateTime, nullable=True, default=datetime.utcnow)
+    updatedAt = Column(
+        DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
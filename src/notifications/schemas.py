@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class SmsStatus(str, Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
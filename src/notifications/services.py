@@ -0,0 +1,250 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import get_logger, get_settings
+from database import async_session_maker
+from http_client import CircuitOpenError, sms_breaker
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils import RSVP_SMS_MESSAGE, send_personalised_sms, send_sms
+
+from .models import SmsOutbox
+from .schemas import SmsStatus
+
+logger = get_logger()
+settings = get_settings()
+
+
+async def enqueue_sms(
+    session: AsyncSession,
+    phone_numbers: Iterable[Optional[str]],
+    message: str = RSVP_SMS_MESSAGE,
+    sender_id: str = "GSC24",
+) -> int:
+    """Add SMS to the outbox inside the caller's transaction.
+
+    The caller commits, so the messages are stored together with the write
+    that triggered them or not at all, and then calls
+    ``sms_dispatcher.notify()``. Database errors are left to the caller.
+    """
+    rows = [
+        {"phone_number": phone_number, "message": message, "sender_id": sender_id}
+        for phone_number in dict.fromkeys(phone_numbers)
+        if phone_number
+    ]
+    if rows:
+        await session.execute(insert(SmsOutbox), rows)
+    return len(rows)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.sms_retry_base_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.sms_retry_max_seconds))
+
+
+def provider_message_ids(response: dict) -> Dict[str, str]:
+    data = response.get("data") or {}
+    entries = data.get("data") if isinstance(data, dict) else None
+    return {
+        str(entry.get("recipient")): str(entry.get("id"))
+        for entry in entries or []
+        if isinstance(entry, dict) and entry.get("id")
+    }
+
+
+class SmsDispatcher:
+    """Background worker draining the ``sms_outbox`` table.
+
+    Each pass claims due rows, groups them by sender and message, dedupes the
+    phone numbers and posts them to Arkesel in chunks of ``recipient_limit``,
+    ``concurrency`` requests at a time. Personalised rows go through Arkesel's
+    template endpoint, which fills in each recipient's ``variables``.
+    Failed chunks are retried with exponential backoff until ``max_attempts``;
+    chunks refused by the open circuit go back to pending without using up an
+    attempt.
+    Rows left in ``sending`` by a crashed worker are reclaimed after
+    ``sms_claim_timeout`` seconds.
+    """
+
+    def __init__(
+        self, batch_size: int, recipient_limit: int, interval: float, concurrency: int
+    ):
+        self.batch_size = batch_size
+        self.recipient_limit = recipient_limit
+        self.interval = interval
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.wakeup = asyncio.Event()
+        self.worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.worker is None:
+            # Bind the primitives to the loop of the app being started.
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            self.wakeup = asyncio.Event()
+            self.worker = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    def notify(self):
+        self.wakeup.set()
+
+    async def run(self):
+        while True:
+            try:
+                while await self.dispatch() == self.batch_size:
+                    pass
+            except Exception:
+                logger.error("SMS dispatch failed", exc_info=True)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+    async def claim(self, session: AsyncSession) -> List[SmsOutbox]:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.sms_claim_timeout)
+        db_results = await session.execute(
+            select(SmsOutbox)
+            .where(
+                or_(
+                    and_(
+                        SmsOutbox.status == SmsStatus.pending.value,
+                        SmsOutbox.next_attempt_at <= now,
+                    ),
+                    and_(
+                        SmsOutbox.status == SmsStatus.sending.value,
+                        SmsOutbox.claimed_at < stale_before,
+                    ),
+                )
+            )
+            .order_by(SmsOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = db_results.scalars().all()
+        for message in messages:
+            message.status = SmsStatus.sending.value
+            message.claimed_at = now
+        await session.commit()
+        return messages
+
+    async def dispatch(self) -> int:
+        # Leave rows pending while the provider is failing instead of burning
+        # their attempts.
+        if sms_breaker.is_open:
+            return 0
+        async with async_session_maker() as session:
+            messages = await self.claim(session)
+            if not messages:
+                return 0
+            await self.deliver(messages)
+            await session.commit()
+        return len(messages)
+
+    async def deliver(self, messages: List[SmsOutbox]):
+        """Send claimed rows and record the outcome on them.
+
+        Rows are grouped by sender and text (the template, for personalised
+        rows) so identical messages share one request; the requests run
+        concurrently, at most ``concurrency`` at a time. The caller commits
+        the session the rows belong to.
+        """
+        groups: Dict[
+            Tuple[str, str, bool], Dict[str, List[SmsOutbox]]
+        ] = defaultdict(lambda: defaultdict(list))
+        for message in messages:
+            key = (message.sender_id, message.message, message.variables is not None)
+            groups[key][message.phone_number].append(message)
+
+        async def send_chunk(
+            sender_id: str, text: str, personalised: bool, chunk: Dict[str, list]
+        ):
+            chunk_messages = [
+                message for recipients in chunk.values() for message in recipients
+            ]
+            try:
+                async with self.semaphore:
+                    if personalised:
+                        response = await send_personalised_sms(
+                            recipients={
+                                number: recipients[0].variables
+                                for number, recipients in chunk.items()
+                            },
+                            message=text,
+                            sender_id=sender_id,
+                        )
+                    else:
+                        response = await send_sms(
+                            phone_numbers=list(chunk), message=text, sender_id=sender_id
+                        )
+            except CircuitOpenError:
+                self.release(chunk_messages)
+                return
+            self.record(chunk_messages, response)
+
+        sends = []
+        for (sender_id, text, personalised), recipients in groups.items():
+            phone_numbers = list(recipients)
+            for start in range(0, len(phone_numbers), self.recipient_limit):
+                chunk = {
+                    number: recipients[number]
+                    for number in phone_numbers[start : start + self.recipient_limit]
+                }
+                sends.append(send_chunk(sender_id, text, personalised, chunk))
+        await asyncio.gather(*sends)
+
+    def release(self, messages: List[SmsOutbox]):
+        """Hand rows the provider never saw back to the queue, attempts intact."""
+        for message in messages:
+            message.status = SmsStatus.pending.value
+            message.claimed_at = None
+        logger.warning(f"SMS circuit open, left {len(messages)} recipients pending")
+
+    def record(self, messages: List[SmsOutbox], response: Optional[dict]):
+        now = datetime.utcnow()
+        succeeded = (
+            bool(response)
+            and response.get("status") == "success"
+            and not (
+                isinstance(response["data"], dict)
+                and response["data"].get("status", "success") != "success"
+            )
+        )
+        if succeeded:
+            message_ids = provider_message_ids(response)
+        for message in messages:
+            message.attempts += 1
+            message.claimed_at = None
+            if succeeded:
+                message.status = SmsStatus.sent.value
+                message.sentAt = now
+                message.last_error = None
+                message.provider_message_id = message_ids.get(message.phone_number)
+                continue
+            message.last_error = str((response or {}).get("details"))[:500]
+            if message.attempts >= settings.sms_max_attempts:
+                message.status = SmsStatus.failed.value
+            else:
+                message.status = SmsStatus.pending.value
+                message.next_attempt_at = now + retry_delay(message.attempts)
+        if not succeeded:
+            logger.warning(f"Unable to send SMS to {len(messages)} recipients")
+
+
+sms_dispatcher = SmsDispatcher(
+    batch_size=settings.sms_batch_size,
+    recipient_limit=settings.sms_recipient_limit,
+    interval=settings.sms_dispatch_interval,
+    concurrency=settings.sms_dispatch_concurrency,
+)
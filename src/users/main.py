@@ -1,17 +1,30 @@
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from admins.schemas import OrganiserRead
 from admins.services import get_organiser_by_id
 from attendance.schemas import EventAttendanceCreate, EventAttendanceRead
 from config import get_settings
 from database import get_async_session
-from events.schemas import EventListingRead, EventRead, EventReadWithOrganiser
-from fastapi import Depends, FastAPI, HTTPException, BackgroundTasks
+from events.schemas import (
+    EventCalendar,
+    EventListingRead,
+    EventNearbyRead,
+    EventRead,
+    EventReadWithOrganiser,
+)
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi_pagination import add_pagination
 from fastapi_pagination.links import Page
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils import (
+    conditional_json_response,
+    etag_matches,
+    json_payload,
+    not_modified_response,
+    version_etag,
+)
 
 from .models import User
 from .schemas import (
@@ -22,16 +35,21 @@ from .schemas import (
 )
 from .services import (
     check_user_following_organiser,
-    create_attenances,
     create_following,
     get_all_events,
+    get_all_events_listing,
     get_all_followings,
     get_event_by_id,
+    get_events_calendar,
+    get_nearby_events,
+    rsvp_attendance,
 )
-from .utils import auth_backend, fastapi_users, send_sms
-# from ..utils import send_sms
+from .utils import auth_backend, fastapi_users
 
 settings = get_settings()
+EVENT_LISTING_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+EVENT_DETAIL_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+ORGANISER_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=600"
 users_app = FastAPI(title="Users API", version="0.1.0")
 
 auth_router = fastapi_users.get_auth_router(auth_backend)
@@ -58,50 +76,87 @@ get_current_active_user = fastapi_users.current_user(active=True, optional=True)
 
 @users_app.get("/events/mini", tags=["Events"], response_model=Page[EventListingRead])
 async def get_events_mini(
+    request: Request,
     query: Optional[str] = "",
     start_date: Optional[Union[datetime, None]] = None,
     end_date: Optional[Union[datetime, None]] = None,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_active_user),
 ):
-    return await get_all_events(
+    payload = await get_all_events_listing(
         session=session, query=query, start_date=start_date, end_date=end_date
     )
+    return conditional_json_response(request, payload, EVENT_LISTING_CACHE_CONTROL)
 
 
 @users_app.get("/events", tags=["Events"], response_model=Page[EventRead])
 async def get_events(
+    request: Request,
     query: Optional[str] = "",
     session: AsyncSession = Depends(get_async_session),
     start_date: Optional[Union[datetime, None]] = None,
     end_date: Optional[Union[datetime, None]] = None,
     user: User = Depends(get_current_active_user),
 ):
-    return await get_all_events(
+    payload = await get_all_events(
         session=session, query=query, start_date=start_date, end_date=end_date
     )
+    return conditional_json_response(request, payload, EVENT_LISTING_CACHE_CONTROL)
+
+
+@users_app.get("/events/calendar", response_model=EventCalendar, tags=["Events"])
+async def get_events_calendar_month(
+    request: Request,
+    month: str = Query(pattern=r"^\d{4}-(0[1-9]|1[0-2])$", examples=["2024-12"]),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_active_user),
+):
+    payload = await get_events_calendar(session=session, month=month)
+    return conditional_json_response(request, payload, EVENT_LISTING_CACHE_CONTROL)
+
+
+@users_app.get(
+    "/events/nearby", response_model=List[EventNearbyRead], tags=["Events"]
+)
+async def get_events_nearby(
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius_km: float = Query(default=20, gt=0, le=500),
+    limit: int = Query(default=50, ge=1, le=200),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_active_user),
+):
+    return await get_nearby_events(
+        session=session, lat=lat, lng=lng, radius_km=radius_km, limit=limit
+    )
 
 
 @users_app.get(
     "/events/{event_id}", response_model=EventReadWithOrganiser, tags=["Events"]
 )
 async def get_an_event(
+    request: Request,
     event_id: str,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_active_user),
 ):
-    return await get_event_by_id(session=session, event_id=event_id)
+    payload = await get_event_by_id(session=session, event_id=event_id)
+    return conditional_json_response(request, payload, EVENT_DETAIL_CACHE_CONTROL)
 
 
 @users_app.get(
     "/events/{event_id}/mini", response_model=EventListingRead, tags=["Events"]
 )
 async def get_an_event_mini(
+    request: Request,
     event_id: str,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_active_user),
 ):
-    return await get_event_by_id(session=session, event_id=event_id)
+    payload = await get_event_by_id(
+        session=session, event_id=event_id, schema=EventListingRead
+    )
+    return conditional_json_response(request, payload, EVENT_DETAIL_CACHE_CONTROL)
 
 
 @users_app.post(
@@ -109,7 +164,6 @@ async def get_an_event_mini(
 )
 async def rsvp_an_event(
     event_id: str,
-    background_tasks: BackgroundTasks,
     data: Optional[EventAttendanceCreate] = None,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_active_user),
@@ -124,20 +178,29 @@ async def rsvp_an_event(
     if data is None and user is not None:
         data = EventAttendanceCreate(**user.__dict__)
     print(data)
-    attendee = await create_attenances(session=session, event_id=event_id, data=data)
+    attendee, _ = await rsvp_attendance(
+        session=session, event_id=event_id, data=data
+    )
     print(attendee)
-    background_tasks.add_task(send_sms, phone_numbers=[attendee.phone_number])
     return attendee
 
 @users_app.get(
     "/organisers/{organiser_id}", response_model=OrganiserRead, tags=["Organisers"]
 )
 async def get_an_organiser(
+    request: Request,
     organiser_id: str,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_active_user),
 ):
-    return await get_organiser_by_id(session=session, organiser_id=organiser_id)
+    organiser = await get_organiser_by_id(session=session, organiser_id=organiser_id)
+    etag = version_etag(organiser.id, organiser.updatedAt)
+    if etag_matches(request, etag):
+        return not_modified_response(etag, ORGANISER_CACHE_CONTROL)
+    payload = json_payload(OrganiserRead.model_validate(organiser, from_attributes=True))
+    return conditional_json_response(
+        request, payload._replace(etag=etag), ORGANISER_CACHE_CONTROL
+    )
 
 
 @users_app.post("/me/following/{organiser_id}", tags=["Organisers"])
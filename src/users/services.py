@@ -1,18 +1,51 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Type
 
+import numpy as np
 from admins.services import get_organiser_by_id
-from attendance.models import EventAttendance
+from attendance.buffer import rsvp_buffer
 from attendance.schemas import EventAttendanceCreate
+from attendance.services import check_attendance_writable, upsert_attendance
+from config import get_settings
+from events.cache import event_catalog_cache
+from events.geo import geohash_search_cells, haversine_km
 from events.models import Events
+from events.schemas import (
+    EventCalendar,
+    EventCalendarDay,
+    EventNearbyRead,
+    EventRead,
+    EventReadWithOrganiser,
+)
+from events.services import (
+    event_listing_statement,
+    rows_to_event_listings,
+    search_events,
+)
 from fastapi import HTTPException
+from fastapi_pagination import resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import func, select
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import func, or_, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from utils import RSVP_SMS_MESSAGE, json_payload
 
 from .models import Following, User
 
+settings = get_settings()
+event_read_adapter = TypeAdapter(List[EventRead])
+
+
+def rows_to_events(events) -> List[EventRead]:
+    return event_read_adapter.validate_python(events, from_attributes=True)
+
+
+def catalog_key(kind: str, *args):
+    params = resolve_params()
+    return (kind, *args, params.page, params.size)
+
 
 async def get_all_events(
     session: AsyncSession,
@@ -20,10 +53,12 @@ async def get_all_events(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
 ):
-    statement = select(Events).filter(
-        Events.name.ilike(
-            f"%{query}%",
-        ),
+    key = catalog_key("events", query, start_date, end_date)
+    payload = event_catalog_cache.get(key)
+    if payload is not None:
+        return payload
+
+    statement = select(Events).options(selectinload(Events.images)).filter(
         Events.published == True,  # noqa: E712
     )
     if start_date and end_date:
@@ -32,29 +67,173 @@ async def get_all_events(
         )
 
     try:
-        return await paginate(conn=session, query=statement)
+        statement = await search_events(
+            session=session, statement=statement, query=query, published=True
+        )
+        page = await paginate(
+            conn=session, query=statement, transformer=rows_to_events
+        )
     except SQLAlchemyError:
         raise HTTPException(500, detail="Something went wrong")
+    payload = json_payload(page)
+    event_catalog_cache.set(key, payload)
+    return payload
+
 
+async def get_all_events_listing(
+    session: AsyncSession,
+    query: Optional[str],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    key = catalog_key("listing", query, start_date, end_date)
+    payload = event_catalog_cache.get(key)
+    if payload is not None:
+        return payload
+
+    statement = event_listing_statement().filter(
+        Events.published == True,  # noqa: E712
+    )
+    if start_date and end_date:
+        statement = statement.filter(
+            Events.start_date >= start_date, Events.start_date <= end_date
+        )
 
-async def get_event_by_id(session: AsyncSession, event_id: str):
     try:
-        db_result = await session.execute(select(Events).where(Events.id == event_id))
+        statement = await search_events(
+            session=session, statement=statement, query=query, published=True
+        )
+        page = await paginate(
+            conn=session, query=statement, transformer=rows_to_event_listings
+        )
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+    payload = json_payload(page)
+    event_catalog_cache.set(key, payload)
+    return payload
+
+
+async def get_event_by_id(
+    session: AsyncSession,
+    event_id: str,
+    schema: Type[BaseModel] = EventReadWithOrganiser,
+):
+    key = ("event", schema.__name__, str(event_id))
+    payload = event_catalog_cache.get(key)
+    if payload is not None:
+        return payload
+    statement = select(Events).options(joinedload(Events.organiser))
+    if "images" in schema.model_fields:
+        statement = statement.options(selectinload(Events.images))
+    try:
+        db_result = await session.execute(statement.where(Events.id == event_id))
         event = db_result.scalar_one_or_none()
-        if event is None:
-            raise HTTPException(404, detail="Event not found")
-        return event
     except SQLAlchemyError:
         raise HTTPException(500, detail="Something went wrong")
+    if event is None:
+        raise HTTPException(404, detail="Event not found")
+    payload = json_payload(schema.model_validate(event, from_attributes=True))
+    event_catalog_cache.set(key, payload)
+    return payload
+
+
+async def get_events_calendar(session: AsyncSession, month: str):
+    """Published events of ``month`` (``YYYY-MM``) grouped per day, cached."""
+    key = ("calendar", month)
+    payload = event_catalog_cache.get(key)
+    if payload is not None:
+        return payload
+
+    year, month_number = (int(part) for part in month.split("-"))
+    month_start = datetime(year, month_number, 1)
+    month_end = (
+        datetime(year + 1, 1, 1)
+        if month_number == 12
+        else datetime(year, month_number + 1, 1)
+    )
+    statement = (
+        event_listing_statement()
+        .where(
+            Events.published == True,  # noqa: E712
+            Events.start_date >= month_start,
+            Events.start_date < month_end,
+        )
+        .order_by(Events.start_date, Events.id)
+    )
+    try:
+        rows = (await session.execute(statement)).all()
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+
+    days = {}
+    for listing in rows_to_event_listings(rows):
+        days.setdefault(listing.start_date.date(), []).append(listing)
+    payload = json_payload(
+        EventCalendar(
+            month=month,
+            days=[
+                EventCalendarDay(day=day, count=len(events), events=events)
+                for day, events in days.items()
+            ],
+        )
+    )
+    event_catalog_cache.set(key, payload)
+    return payload
+
+
+async def get_nearby_events(
+    session: AsyncSession, lat: float, lng: float, radius_km: float, limit: int
+) -> List[EventNearbyRead]:
+    """Published events within ``radius_km``, nearest first.
+
+    The geohash index narrows the scan to the cells around the point; exact
+    distances are then computed for all candidates at once with numpy.
+    """
+    statement = (
+        event_listing_statement()
+        .add_columns(Events.lat, Events.lng)
+        .where(Events.published == True, Events.geohash.is_not(None))  # noqa: E712
+    )
+    cells = geohash_search_cells(lat, lng, radius_km)
+    if cells != [""]:
+        statement = statement.where(
+            or_(*[Events.geohash.like(f"{cell}%") for cell in cells])
+        )
+    try:
+        rows = (await session.execute(statement)).all()
+    except SQLAlchemyError:
+        raise HTTPException(500, detail="Something went wrong")
+    if not rows:
+        return []
+
+    distances = haversine_km(
+        lat,
+        lng,
+        np.fromiter((row.lat for row in rows), dtype=float, count=len(rows)),
+        np.fromiter((row.lng for row in rows), dtype=float, count=len(rows)),
+    )
+    nearest = np.argsort(distances, kind="stable")
+    nearest = nearest[distances[nearest] <= radius_km][:limit]
+    listings = rows_to_event_listings([rows[index] for index in nearest])
+    return [
+        EventNearbyRead(
+            **listing.model_dump(), distance_km=round(float(distances[index]), 3)
+        )
+        for listing, index in zip(listings, nearest)
+    ]
 
 
-async def create_attenances(
+async def rsvp_attendance(
     session: AsyncSession, event_id: str, data: EventAttendanceCreate
 ):
-    new_attendance = EventAttendance(**data.model_dump(), event_id=event_id)
-    session.add(new_attendance)
-    await session.commit()
-    return new_attendance
+    if settings.rsvp_batching:
+        await check_attendance_writable(session=session, event_id=event_id)
+        return await rsvp_buffer.submit(
+            event_id=event_id, data=data, sms_message=RSVP_SMS_MESSAGE
+        )
+    return await upsert_attendance(
+        session=session, event_id=event_id, data=data, sms_message=RSVP_SMS_MESSAGE
+    )
 
 
 async def create_following(session: AsyncSession, organiser_id: str, user: User):
@@ -1,18 +1,82 @@
+import asyncio
+import hashlib
+import inspect
 import os
 import time
 import uuid
-from typing import Any, Dict, Optional, List
-from config import get_settings
-import httpx
+from typing import Any, Callable, Dict, NamedTuple, Optional, List
+from config import get_logger, get_settings
+from http_client import CircuitOpenError, http_client, sms_breaker
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import case, func
 
 
 settings = get_settings()
+logger = get_logger()
 
 
 def remove_none(dict: Dict[str, Any]):
     return {key: value for key, value in dict.items() if value is not None}
 
 
+def json_bytes_response(model: BaseModel) -> Response:
+    """Render an already validated model straight to JSON bytes.
+
+    Skips FastAPI's response_model round trip of re-validating the value and
+    passing it through jsonable_encoder.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+class JsonPayload(NamedTuple):
+    content: bytes
+    etag: str
+
+
+def json_payload(model: BaseModel) -> JsonPayload:
+    """Serialize a model once and tag it with a hash of its content."""
+    content = model.model_dump_json().encode()
+    return JsonPayload(content, f'"{hashlib.sha1(content).hexdigest()}"')
+
+
+def version_etag(*parts: Any) -> str:
+    """ETag derived from identifiers and ``updatedAt`` values, no body needed."""
+    version = "-".join(str(part) for part in parts)
+    return f'"{hashlib.sha1(version.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def conditional_json_response(
+    request: Request, payload: JsonPayload, cache_control: str
+) -> Response:
+    if etag_matches(request, payload.etag):
+        return not_modified_response(payload.etag, cache_control)
+    return Response(
+        content=payload.content,
+        media_type="application/json",
+        headers={"ETag": payload.etag, "Cache-Control": cache_control},
+    )
+
+
+def count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
 def generate_unique_filename(prefix="", length=8):
     # Generate a UUID
     unique_id = uuid.uuid4()
@@ -27,20 +91,32 @@ def generate_unique_filename(prefix="", length=8):
     return unique_string[:length]
 
 
-def delete_file(file_path: str, seconds: Optional[float] = 300):
-    time.sleep(seconds)
-    if os.path.exists(file_path):
-        # Attempt to delete the file
+def delete_expired_files(folder: str, max_age: float, suffix: str = ""):
+    if not os.path.isdir(folder):
+        return
+    expired_before = time.time() - max_age
+    for entry in os.scandir(folder):
+        if not entry.is_file() or not entry.name.endswith(suffix):
+            continue
         try:
-            os.remove(file_path)
-        except OSError as e:
-            print(f"Error deleting file '{file_path}': {e}")
-    else:
-        print(f"File '{file_path}' does not exist.")
+            if entry.stat().st_mtime < expired_before:
+                os.remove(entry.path)
+        except OSError:
+            logger.error(f"Error deleting file '{entry.path}'", exc_info=True)
 
 
-async def send_sms(phone_numbers: List[str], message: str = "", sender_id: str = "GSC24"):
-    payloadMessage = """
+async def run_periodically(func: Callable[[], Any], seconds: float):
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.error(f"Periodic task {func.__name__} failed", exc_info=True)
+
+
+RSVP_SMS_MESSAGE = """
     Thank you for registering for a once in a lifetime opportunity,Good Shepherd Conference 2024. We're excited to experience God's presence with you. 
 
 Here are the event details: 
@@ -53,22 +129,53 @@ https://gsc.szfamily.org
 
 See you there!
     """
-    payload = {
-        "sender": "GSC24",  # Replace with your sender ID
-        "message": payloadMessage,
-        "recipients": phone_numbers,
-    }
+
+
+async def post_to_arkesel(url: str, payload: Dict[str, Any]):
     headers = {
         "api-key": settings.arkesel_api_key,
         "Content-Type": "application/json"
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(settings.arkesel_url, json=payload, headers=headers)
+        response = await http_client.post(
+            url, json=payload, headers=headers, breaker=sms_breaker
+        )
         if response.status_code == 200:
             return {"status": "success", "data": response.json()}
         else:
-            return {"status": "error", "details": response.json()}
+            return {"status": "error", "details": response.text}
+    except CircuitOpenError:
+        # Never reached Arkesel, so callers must not count it as an attempt.
+        raise
     except Exception as e:
-        print(f"Unable to send message to {phone_numbers}")
\ No newline at end of file
+        print(f"Unable to send message to {list(payload['recipients'])}")
+        return {"status": "error", "details": str(e)}
+
+
+async def send_sms(
+    phone_numbers: List[str], message: str = RSVP_SMS_MESSAGE, sender_id: str = "GSC24"
+):
+    payload = {
+        "sender": sender_id,
+        "message": message,
+        "recipients": phone_numbers,
+    }
+    return await post_to_arkesel(settings.arkesel_url, payload)
+
+
+async def send_personalised_sms(
+    recipients: Dict[str, Dict[str, str]], message: str, sender_id: str = "GSC24"
+):
+    """Send one template that Arkesel fills in for every recipient.
+
+    ``message`` uses Arkesel's ``<%name%>`` placeholders and ``recipients`` maps
+    each phone number to its values, so personalised text still goes out in
+    batches instead of one request per recipient.
+    """
+    payload = {
+        "sender": sender_id,
+        "message": message,
+        "recipients": recipients,
+    }
+    return await post_to_arkesel(settings.arkesel_template_url, payload)
@@ -0,0 +1,139 @@
+"""Time the hot attendance queries with and without the composite indexes.
+
+Run from the repository root:
+
+    python tests/bench_attendance_queries.py --events 20 --attendees 5000
+
+Seeds a throwaway SQLite database, times the summary, keyset list and id
+lookup queries, drops the event_id composite indexes and times them again.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from conftest import ORGANISER_ID, reset_database
+
+from attendance.models import EventAttendance
+from attendance.services import (
+    get_event_attendance_by_id,
+    get_event_attendances_keyset,
+    get_event_summary,
+)
+from database import async_session_maker, engine
+from events.models import Events
+from sqlalchemy import insert, select, text
+
+COMPOSITE_INDEXES = [
+    "ix_event_attandance_event_id_present",
+    "ix_event_attandance_event_id_first_name_id",
+    "ix_event_attandance_event_id_email",
+    "ix_event_attandance_event_id_updatedAt",
+]
+
+
+async def seed(events: int, attendees: int):
+    await reset_database()
+    event_ids = [uuid.uuid4() for _ in range(events)]
+    async with async_session_maker() as session:
+        session.add_all(
+            Events(id=event_id, name=f"Event {index}", organiser_id=ORGANISER_ID)
+            for index, event_id in enumerate(event_ids)
+        )
+        await session.commit()
+        for event_id in event_ids:
+            await session.execute(
+                insert(EventAttendance),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "event_id": event_id,
+                        "email": f"attendee{index}@example.com",
+                        "first_name": f"First{random.randrange(attendees):06d}",
+                        "present": index % 3 == 0,
+                        "occupation": ("student", "worker")[index % 2],
+                    }
+                    for index in range(attendees)
+                ],
+            )
+        await session.commit()
+    return event_ids
+
+
+async def sample_ids(event_ids, count: int):
+    async with async_session_maker() as session:
+        pairs = []
+        for event_id in random.sample(event_ids, min(count, len(event_ids))):
+            attendance_id = await session.scalar(
+                select(EventAttendance.id)
+                .where(EventAttendance.event_id == event_id)
+                .limit(1)
+            )
+            pairs.append((event_id, attendance_id))
+        return pairs
+
+
+async def timed(label: str, repeat: int, query):
+    durations = []
+    for _ in range(repeat):
+        async with async_session_maker() as session:
+            start = time.perf_counter()
+            await query(session)
+            durations.append((time.perf_counter() - start) * 1000)
+    return label, statistics.median(durations)
+
+
+async def run_queries(event_ids, pairs, repeat: int):
+    event_id = event_ids[len(event_ids) // 2]
+    attendance_event_id, attendance_id = pairs[0]
+    return [
+        await timed(
+            "summary",
+            repeat,
+            lambda session: get_event_summary(session=session, event_id=event_id),
+        ),
+        await timed(
+            "keyset list",
+            repeat,
+            lambda session: get_event_attendances_keyset(
+                session=session, event_id=event_id, query="", size=50
+            ),
+        ),
+        await timed(
+            "lookup by id",
+            repeat,
+            lambda session: get_event_attendance_by_id(
+                session=session,
+                event_id=attendance_event_id,
+                attendance_id=attendance_id,
+            ),
+        ),
+    ]
+
+
+async def main(events: int, attendees: int, repeat: int):
+    event_ids = await seed(events, attendees)
+    pairs = await sample_ids(event_ids, 1)
+    with_indexes = await run_queries(event_ids, pairs, repeat)
+
+    async with engine.begin() as conn:
+        for index in COMPOSITE_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    without_indexes = await run_queries(event_ids, pairs, repeat)
+    await engine.dispose()
+
+    print(f"{events} events x {attendees} attendees, median of {repeat} runs")
+    print(f"{'query':<14}{'indexed ms':>12}{'unindexed ms':>14}")
+    for (label, indexed), (_, unindexed) in zip(with_indexes, without_indexes):
+        print(f"{label:<14}{indexed:>12.2f}{unindexed:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--attendees", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.attendees, args.repeat))
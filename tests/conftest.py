@@ -0,0 +1,149 @@
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+# The test database is always a throwaway SQLite file, whatever .env says.
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{TEST_DB_PATH}"
+for key in (
+    "AUTHJWT_SECRET_KEY",
+    "JWT_SECRET",
+    "RESET_PASSWORD_TOKEN_SECRET",
+    "VERIFICATION_TOKEN_SECRET",
+    "ARKESEL_API_KEY",
+):
+    os.environ.setdefault(key, "test")
+os.environ.setdefault("JWT_EXPIRE_TIME", "3600")
+
+from admins.main import get_current_active_user  # noqa: E402
+from admins.models import Admins, Organisers  # noqa: E402
+from attendance.counters import attendance_counters  # noqa: E402
+from attendance.main import attendance_app  # noqa: E402
+from attendance.models import EventAttendance  # noqa: E402
+from config import get_settings  # noqa: E402
+from database import Base, async_session_maker, engine  # noqa: E402
+from events.cache import event_catalog_cache  # noqa: E402
+from events.main import event_app  # noqa: E402
+from events.models import EventImages, Events  # noqa: E402
+from fake_arkesel import FakeArkesel  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from http_client import sms_breaker  # noqa: E402
+from main import app  # noqa: E402
+from notifications.services import sms_dispatcher  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+ORGANISER_ID = uuid.uuid4()
+EVENT_ID = uuid.uuid4()
+
+
+async def reset_database():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as session:
+        session.add(
+            Organisers(id=ORGANISER_ID, name="Spirit Zone", followers_count=0, summary="")
+        )
+        session.add(
+            Events(
+                id=EVENT_ID,
+                name="Good Shepherd Conference",
+                summary="Annual conference",
+                organiser_id=ORGANISER_ID,
+                published=True,
+                start_date=datetime.utcnow() + timedelta(days=7),
+                images=[EventImages(url=f"https://img/{i}.png") for i in range(3)],
+            )
+        )
+        await session.commit()
+    async with async_session_maker() as session:
+        await attendance_counters.seed(session)
+    event_catalog_cache.clear()
+
+
+async def add_attendees(count: int, event_id=EVENT_ID, **values):
+    async with async_session_maker() as session:
+        session.add_all(
+            EventAttendance(
+                event_id=event_id,
+                email=f"attendee{index}@example.com",
+                first_name=f"First{index:05d}",
+                last_name="Last",
+                phone_number=f"0244{index:06d}",
+                present=index % 3 == 0,
+                occupation=("student", "worker")[index % 2],
+                **values,
+            )
+            for index in range(count)
+        )
+        await session.commit()
+
+
+@pytest.fixture
+def admin():
+    return Admins(
+        id=uuid.uuid4(),
+        email="admin@example.com",
+        hashed_password="x",
+        organiser_id=ORGANISER_ID,
+        is_active=True,
+        is_verified=True,
+    )
+
+
+@pytest.fixture
+def client(admin):
+    for sub_app in (attendance_app, event_app):
+        sub_app.dependency_overrides[get_current_active_user] = lambda: admin
+    with TestClient(app) as test_client:
+        test_client.portal.call(reset_database)
+        yield test_client
+        # The engine's pool belongs to this client's event loop.
+        test_client.portal.call(engine.dispose)
+    for sub_app in (attendance_app, event_app):
+        sub_app.dependency_overrides.pop(get_current_active_user, None)
+
+
+@pytest.fixture
+def fake_arkesel(monkeypatch):
+    server = FakeArkesel(api_key=get_settings().arkesel_api_key)
+    server.start()
+    monkeypatch.setattr(get_settings(), "arkesel_url", server.url)
+    monkeypatch.setattr(get_settings(), "arkesel_template_url", server.template_url)
+    sms_breaker.record_success()
+    yield server
+    server.stop()
+    sms_breaker.record_success()
+
+
+@pytest.fixture
+def sms_client(client, fake_arkesel):
+    """Client whose SMS outbox is only drained when a test calls ``dispatch``."""
+    client.portal.call(sms_dispatcher.stop)
+    return client
+
+
+@contextmanager
+def capture_statements():
+    """Collect ``(sql, parameters)`` for every statement the app engine runs."""
+    statements: List[Tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(
+            engine.sync_engine, "before_cursor_execute", before_cursor_execute
+        )
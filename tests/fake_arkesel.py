@@ -0,0 +1,65 @@
+"""Local stand-in for the Arkesel SMS API, served over real HTTP for tests.
+
+Records every request to ``/api/v2/sms/send`` and the personalised
+``/api/v2/sms/template/send`` and answers like Arkesel. Queue status codes in
+``failures`` to make the next requests fail.
+"""
+import socket
+import threading
+import time
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeArkesel:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.requests: List[Dict[str, Any]] = []
+        self.failures: List[int] = []
+        self.app = FastAPI()
+        self.app.post("/api/v2/sms/send")(self.send)
+        self.app.post("/api/v2/sms/template/send")(self.send)
+        self.server = None
+        self.url = None
+        self.template_url = None
+
+    async def send(self, request: Request):
+        if request.headers.get("api-key") != self.api_key:
+            return JSONResponse({"status": "error", "message": "Invalid API key"}, 401)
+        body = await request.json()
+        self.requests.append(body)
+        if self.failures:
+            return JSONResponse(
+                {"status": "error", "message": "Service unavailable"},
+                self.failures.pop(0),
+            )
+        return {
+            "status": "success",
+            "data": [
+                {"recipient": recipient, "id": f"msg-{len(self.requests)}-{recipient}"}
+                for recipient in body["recipients"]
+            ],
+        }
+
+    @property
+    def recipients(self) -> List[List[str]]:
+        return [list(body["recipients"]) for body in self.requests]
+
+    def start(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.server = uvicorn.Server(
+            uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="error")
+        )
+        threading.Thread(target=self.server.run, daemon=True).start()
+        while not self.server.started:
+            time.sleep(0.01)
+        self.url = f"http://127.0.0.1:{port}/api/v2/sms/send"
+        self.template_url = f"http://127.0.0.1:{port}/api/v2/sms/template/send"
+
+    def stop(self):
+        self.server.should_exit = True
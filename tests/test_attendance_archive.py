@@ -0,0 +1,112 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+import attendance.services as attendance_services
+from conftest import EVENT_ID, ORGANISER_ID, add_attendees
+from database import async_session_maker
+from events.models import Events
+
+
+async def start_event_days_ago(days: int, event_id=EVENT_ID):
+    async with async_session_maker() as session:
+        await session.execute(
+            update(Events)
+            .where(Events.id == event_id)
+            .values(start_date=datetime.utcnow() - timedelta(days=days))
+        )
+        await session.commit()
+
+
+@pytest.fixture
+def archived(client):
+    client.portal.call(add_attendees, 6)
+    client.portal.call(start_event_days_ago, 200)
+    response = client.post(f"/attendance/{EVENT_ID}/archive")
+    assert response.status_code == 200
+    return client
+
+
+def test_upcoming_event_cannot_be_archived(client):
+    response = client.post(f"/attendance/{EVENT_ID}/archive")
+    assert response.status_code == 409
+
+
+def test_writes_to_archived_event_are_rejected(archived):
+    attendee_id = archived.get(f"/attendance/{EVENT_ID}").json()["items"][0]["id"]
+    new_attendee = {"email": "late@example.com", "first_name": "Late"}
+
+    responses = [
+        archived.post(f"/users/event/{EVENT_ID}", json=new_attendee),
+        archived.post(f"/attendance/{EVENT_ID}", json=new_attendee),
+        archived.patch(
+            f"/attendance/{EVENT_ID}",
+            params={"attendee_id": attendee_id, "present": True},
+        ),
+        archived.patch(
+            f"/attendance/{EVENT_ID}/bulk",
+            json={"attendee_ids": [attendee_id], "present": True},
+        ),
+        archived.post(
+            f"/attendance/{EVENT_ID}/sync/checkins",
+            json={
+                "checkins": [
+                    {
+                        "attendee_id": attendee_id,
+                        "present": True,
+                        "checked_at": datetime.utcnow().isoformat(),
+                    }
+                ]
+            },
+        ),
+        archived.post(
+            f"/attendance/{EVENT_ID}/import",
+            files={"file": ("roster.csv", b"email,first_name\nlate@example.com,Late\n")},
+        ),
+        archived.delete(f"/attendance/{EVENT_ID}", params={"attendee_id": attendee_id}),
+        archived.post(f"/attendance/{EVENT_ID}/archive"),
+    ]
+
+    assert [response.status_code for response in responses] == [409] * len(responses)
+    assert archived.get(f"/attendance/{EVENT_ID}").json()["total"] == 6
+    assert archived.get(f"/attendance/{EVENT_ID}/summary").json()["total"] == 6
+
+
+def test_periodic_archive_continues_past_failures(client, monkeypatch):
+    other_event_id = uuid.uuid4()
+
+    async def add_past_events():
+        async with async_session_maker() as session:
+            session.add(
+                Events(id=other_event_id, name="Retreat", organiser_id=ORGANISER_ID)
+            )
+            await session.commit()
+        await start_event_days_ago(200)
+        await start_event_days_ago(300, event_id=other_event_id)
+
+    client.portal.call(add_past_events)
+    archive = attendance_services.archive_event_attendance
+
+    async def flaky_archive(session, event_id):
+        if event_id == EVENT_ID:
+            raise HTTPException(500, detail="Something went wrong")
+        return await archive(session=session, event_id=event_id)
+
+    monkeypatch.setattr(attendance_services, "archive_event_attendance", flaky_archive)
+    archived = client.portal.call(attendance_services.archive_past_events_attendance)
+    assert archived == [other_event_id]
+
+
+def test_archived_roster_is_still_served(archived):
+    since = (datetime.utcnow() - timedelta(days=1)).isoformat()
+
+    snapshot = archived.get(f"/attendance/{EVENT_ID}/sync/roster")
+    changes = archived.get(f"/attendance/{EVENT_ID}/sync/changes", params={"since": since})
+
+    assert snapshot.status_code == 200
+    assert len(snapshot.json()["rows"]) == 6
+    assert changes.status_code == 200
+    assert len(changes.json()["rows"]) == 6
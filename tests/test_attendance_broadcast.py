@@ -0,0 +1,62 @@
+import time
+import uuid
+
+from admins.models import Organisers
+from conftest import EVENT_ID, add_attendees
+from database import async_session_maker
+from events.models import Events
+from notifications.services import sms_dispatcher
+
+
+def wait_for_broadcast(client, job_id):
+    for _ in range(200):
+        job = client.get(f"/attendance/{EVENT_ID}/broadcasts/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Broadcast {job_id} did not finish")
+
+
+def test_personalised_broadcast_is_sent_in_batches(
+    sms_client, fake_arkesel, monkeypatch
+):
+    monkeypatch.setattr(sms_dispatcher, "recipient_limit", 100)
+    sms_client.portal.call(add_attendees, 250)
+
+    response = sms_client.post(
+        f"/attendance/{EVENT_ID}/broadcast",
+        json={"message": "Hi {first_name}, see you at {event_name}"},
+    )
+    assert response.status_code == 200
+    job = wait_for_broadcast(sms_client, response.json()["id"])
+
+    assert job["status"] == "completed"
+    assert job["sent"] == 250
+    assert sorted(len(chunk) for chunk in fake_arkesel.recipients) == [50, 100, 100]
+    body = fake_arkesel.requests[0]
+    assert body["message"] == "Hi <%first_name%>, see you at Good Shepherd Conference"
+    number, variables = next(iter(body["recipients"].items()))
+    assert variables["first_name"] == f"First{int(number[4:]):05d}"
+
+
+def test_broadcast_is_limited_to_the_admins_events(sms_client, fake_arkesel):
+    other_event_id = uuid.uuid4()
+
+    async def add_other_event():
+        async with async_session_maker() as session:
+            organiser = Organisers(name="Other", followers_count=0, summary="")
+            session.add(organiser)
+            await session.flush()
+            session.add(
+                Events(id=other_event_id, name="Other", organiser_id=organiser.id)
+            )
+            await session.commit()
+        await add_attendees(3, event_id=other_event_id)
+
+    sms_client.portal.call(add_other_event)
+
+    response = sms_client.post(
+        f"/attendance/{other_event_id}/broadcast", json={"message": "Hello"}
+    )
+    assert response.status_code == 404
+    assert fake_arkesel.requests == []
@@ -0,0 +1,50 @@
+import io
+import zipfile
+
+import pytest
+
+from conftest import EVENT_ID
+
+
+def zip_without_workbook() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("roster.csv", "email\n")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("roster.csv", "email,first_name\nzoë@example.com,Zoë\n".encode("latin-1")),
+        ("roster.xlsx", b"email,first_name\nama@example.com,Ama\n"),
+        ("roster.xlsx", b"PK\x03\x04 truncated"),
+        ("roster.xlsx", zip_without_workbook()),
+    ],
+)
+def test_unreadable_import_files_are_rejected(client, filename, content):
+    response = client.post(
+        f"/attendance/{EVENT_ID}/import", files={"file": (filename, content)}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]
+
+
+def test_blank_rows_are_not_counted_as_received(client):
+    roster = (
+        "email,first_name\n"
+        "ama@example.com,Ama\n"
+        ",\n"
+        "\n"
+        "not-an-email,Kofi\n"
+        "ama@example.com,Ama\n"
+    )
+    response = client.post(
+        f"/attendance/{EVENT_ID}/import",
+        files={"file": ("roster.csv", roster.encode())},
+    )
+
+    result = response.json()
+    assert result["received"] == 3
+    assert result["inserted"] + result["duplicates"] + len(result["errors"]) == 3
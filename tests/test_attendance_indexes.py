@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from conftest import EVENT_ID, TEST_DB_PATH, add_attendees, capture_statements
+
+
+def query_plans(statements, table="event_attandance"):
+    """EXPLAIN QUERY PLAN of every captured SELECT reading ``table``."""
+    plans = []
+    with sqlite3.connect(TEST_DB_PATH) as conn:
+        for sql, parameters in statements:
+            if not sql.lstrip().upper().startswith("SELECT") or table not in sql:
+                continue
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+            plans.append((sql, [row[-1] for row in rows]))
+    return plans
+
+
+def assert_uses_index(plans, index_prefix):
+    assert plans
+    for sql, details in plans:
+        reads = [detail for detail in details if "event_attandance" in detail]
+        assert reads, sql
+        for detail in reads:
+            assert detail.startswith("SEARCH"), (sql, details)
+            assert index_prefix in detail, (sql, details)
+
+
+@pytest.fixture
+def attendees(client):
+    client.portal.call(add_attendees, 200)
+    return client
+
+
+def test_summary_uses_event_id_index(attendees):
+    with capture_statements() as statements:
+        response = attendees.get(f"/attendance/{EVENT_ID}/summary")
+    assert response.status_code == 200
+    assert_uses_index(query_plans(statements), "ix_event_attandance_event_id_")
+
+
+def test_list_uses_event_id_first_name_index(attendees):
+    with capture_statements() as statements:
+        response = attendees.get(f"/attendance/{EVENT_ID}", params={"keyset": True})
+    assert response.status_code == 200
+    plans = query_plans(statements)
+    assert_uses_index(plans, "ix_event_attandance_event_id_first_name_id")
+    # The ORDER BY is served by the index, not a temporary sort.
+    for _, details in plans:
+        assert not any("TEMP B-TREE" in detail for detail in details), details
+
+
+def test_lookup_uses_index(attendees):
+    page = attendees.get(f"/attendance/{EVENT_ID}", params={"size": 1}).json()
+    attendee_id = page["items"][0]["id"]
+    with capture_statements() as statements:
+        response = attendees.patch(
+            f"/attendance/{EVENT_ID}",
+            params={"attendee_id": attendee_id, "present": True},
+        )
+    assert response.status_code == 200
+    plans = [
+        plan for plan in query_plans(statements) if "event_attandance.id =" in plan[0]
+    ]
+    assert_uses_index(plans, "INDEX")
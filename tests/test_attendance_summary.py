@@ -0,0 +1,26 @@
+from attendance.models import EventAttendance
+from conftest import EVENT_ID
+from database import async_session_maker
+
+
+async def add_occupations(occupations):
+    async with async_session_maker() as session:
+        session.add_all(
+            EventAttendance(
+                event_id=EVENT_ID,
+                email=f"attendee{index}@example.com",
+                occupation=occupation,
+                present=index == 0,
+            )
+            for index, occupation in enumerate(occupations)
+        )
+        await session.commit()
+
+
+def test_missing_and_typed_unknown_occupations_are_added_up(client):
+    client.portal.call(add_occupations, [None, "unknown", "unknown", "student"])
+
+    occupations = client.get(f"/attendance/{EVENT_ID}/summary").json()["occupations"]
+
+    assert occupations["unknown"] == {"total": 3, "present": 1, "absent": 2}
+    assert occupations["student"]["total"] == 1
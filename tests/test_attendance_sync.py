@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import EVENT_ID, add_attendees
+
+
+@pytest.mark.parametrize("offset, changed", [(-3600, 2), (5, 0)])
+def test_roster_changes_accept_an_aware_since(client, offset, changed):
+    client.portal.call(add_attendees, 2)
+    since = datetime.now(timezone.utc) + timedelta(seconds=offset)
+
+    response = client.get(
+        f"/attendance/{EVENT_ID}/sync/changes",
+        params={"since": since.isoformat().replace("+00:00", "Z")},
+    )
+
+    assert response.status_code == 200
+    roster = response.json()
+    assert len(roster["rows"]) == changed
+    watermark = datetime.fromisoformat(roster["watermark"])
+    assert watermark.tzinfo is None
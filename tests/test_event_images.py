@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from conftest import EVENT_ID
+from database import async_session_maker
+from events.models import EventImages
+
+
+async def backdate_images_without_positions():
+    """Look like images stored before positions existed: all at 0."""
+    async with async_session_maker() as session:
+        for days, url in enumerate(["https://img/2.png", "https://img/0.png"]):
+            await session.execute(
+                update(EventImages)
+                .where(EventImages.url == url)
+                .values(createdAt=datetime.utcnow() - timedelta(days=days + 1))
+            )
+        await session.execute(update(EventImages).values(position=0))
+        await session.commit()
+
+
+def test_images_with_the_same_position_keep_upload_order(client):
+    client.portal.call(backdate_images_without_positions)
+
+    expected = ["https://img/0.png", "https://img/2.png", "https://img/1.png"]
+    for path in (f"/events/{EVENT_ID}", f"/users/events/{EVENT_ID}"):
+        images = client.get(path).json()["images"]
+        assert [image["url"] for image in images] == expected
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import EVENT_ID, ORGANISER_ID, capture_statements
+from database import async_session_maker
+from events.models import EventImages, Events
+
+START_DATE = datetime.utcnow() + timedelta(days=7)
+MONTH = START_DATE.strftime("%Y-%m")
+
+
+async def add_located_events(count: int = 4):
+    async with async_session_maker() as session:
+        session.add_all(
+            Events(
+                name=f"Outreach {index}",
+                organiser_id=ORGANISER_ID,
+                published=True,
+                start_date=START_DATE,
+                latitude="5.6",
+                longitude="-0.2",
+                images=[
+                    EventImages(url=f"https://img/{index}-{image}.png")
+                    for image in range(2)
+                ],
+            )
+            for index in range(count)
+        )
+        await session.commit()
+
+
+# Counts stay the same however many events are listed; relations are loaded
+# with one extra SELECT at most, never once per event.
+@pytest.mark.parametrize(
+    "path, selects",
+    [
+        ("/users/events/mini", 2),
+        ("/users/events", 3),
+        (f"/users/events/{EVENT_ID}", 2),
+        (f"/users/events/{EVENT_ID}/mini", 1),
+        (f"/users/events/calendar?month={MONTH}", 1),
+        ("/users/events/nearby?lat=5.6&lng=-0.2", 1),
+        ("/events/mini", 2),
+        ("/events/", 3),
+        (f"/events/{EVENT_ID}", 2),
+    ],
+)
+def test_event_endpoint_query_count(client, path, selects):
+    client.portal.call(add_located_events)
+
+    with capture_statements() as statements:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.json()
+    assert len(statements) == selects, [sql for sql, _ in statements]
@@ -0,0 +1,58 @@
+from functools import partial
+
+from conftest import EVENT_ID, capture_statements
+from database import async_session_maker
+from events.models import Events
+from events.search import EventSearchIndex, build_event_search_text
+
+
+def build_index(*names):
+    index = EventSearchIndex(ttl=60)
+    index.build(
+        (name, "organiser", True, build_event_search_text(name, "Spirit Zone"))
+        for name in names
+    )
+    return index
+
+
+def test_whole_word_hits_rank_above_prefix_matches():
+    index = build_index("Worshipful", "Worship night", "Youth camp")
+
+    results = index.search("worship")
+
+    assert [event_id for event_id, _ in results] == [
+        "Worship night",
+        "Worshipful",
+    ]
+
+
+def test_prefix_matches_still_complete_the_last_term():
+    index = build_index("Worshipful gathering", "Youth camp")
+
+    assert [event_id for event_id, _ in index.search("spirit wor")] == [
+        "Worshipful gathering"
+    ]
+
+
+async def update_event(**values):
+    async with async_session_maker() as session:
+        event = await session.get(Events, EVENT_ID)
+        for key, value in values.items():
+            setattr(event, key, value)
+        with capture_statements() as statements:
+            await session.commit()
+        return event.search_text, [sql for sql, _ in statements]
+
+
+def test_search_text_is_only_rebuilt_when_its_fields_change(client):
+    search_text, statements = client.portal.call(
+        partial(update_event, published=False)
+    )
+    assert search_text == "good shepherd conference annual conference spirit zone"
+    assert not any("organisers" in sql for sql in statements)
+
+    search_text, statements = client.portal.call(
+        partial(update_event, name="Worship night")
+    )
+    assert search_text == "worship night annual conference spirit zone"
+    assert any("organisers" in sql for sql in statements)
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from http_client import CircuitBreaker, CircuitOpenError, OutboundClient
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 61
+    return breaker
+
+
+def outbound_client(handler):
+    client = OutboundClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_trial_that_raises_does_not_wedge_the_breaker():
+    def handler(request):
+        raise RuntimeError("unexpected")
+
+    breaker = half_open_breaker()
+    with pytest.raises(RuntimeError):
+        asyncio.run(outbound_client(handler).get("http://sms.test", breaker=breaker))
+
+    assert not breaker.is_open
+    assert breaker.allow()
+
+
+def test_cancelled_trial_does_not_wedge_the_breaker():
+    async def handler(request):
+        await asyncio.sleep(10)
+
+    async def cancel_trial(breaker):
+        call = asyncio.create_task(
+            outbound_client(handler).get("http://sms.test", breaker=breaker)
+        )
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    breaker = half_open_breaker()
+    asyncio.run(cancel_trial(breaker))
+    assert breaker.allow()
+
+
+def test_only_one_trial_while_half_open():
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200)
+
+    async def concurrent_calls(breaker):
+        client = outbound_client(handler)
+        return await asyncio.gather(
+            client.get("http://sms.test", breaker=breaker),
+            client.get("http://sms.test", breaker=breaker),
+            return_exceptions=True,
+        )
+
+    breaker = half_open_breaker()
+    trial, refused = asyncio.run(concurrent_calls(breaker))
+    assert trial.status_code == 200
+    assert isinstance(refused, CircuitOpenError)
+    assert breaker.opened_at is None
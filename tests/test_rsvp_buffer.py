@@ -0,0 +1,47 @@
+import pytest
+
+import attendance.buffer as attendance_buffer
+from config import get_settings
+from conftest import EVENT_ID
+
+
+@pytest.fixture
+def batched_client(monkeypatch, request):
+    monkeypatch.setattr(get_settings(), "rsvp_batching", True)
+    return request.getfixturevalue("client")
+
+
+def test_batched_rsvp_accepts_any_spelling_of_the_event_id(batched_client):
+    payload = {"email": "ama@example.com", "first_name": "Ama"}
+    first = batched_client.post(f"/users/event/{str(EVENT_ID).upper()}", json=payload)
+    again = batched_client.post(f"/users/event/{EVENT_ID}", json=payload)
+
+    assert first.status_code == 200
+    assert again.status_code == 200
+    assert first.json()["id"] == again.json()["id"]
+    summary = batched_client.get(f"/attendance/{EVENT_ID}/summary").json()
+    assert summary["total"] == 1
+
+
+def test_batched_rsvp_recovers_after_an_unexpected_error(batched_client, monkeypatch):
+    build_row = attendance_buffer.build_attendance_row
+    calls = []
+
+    def build_row_failing_once(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return build_row(**kwargs)
+
+    monkeypatch.setattr(
+        attendance_buffer, "build_attendance_row", build_row_failing_once
+    )
+    payload = {"email": "ama@example.com", "first_name": "Ama"}
+
+    failed = batched_client.post(f"/users/event/{EVENT_ID}", json=payload)
+    retried = batched_client.post(f"/users/event/{EVENT_ID}", json=payload)
+
+    assert failed.status_code == 500
+    assert retried.status_code == 200
+    summary = batched_client.get(f"/attendance/{EVENT_ID}/summary").json()
+    assert summary["total"] == 1
@@ -0,0 +1,102 @@
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+import attendance.services as attendance_services
+from conftest import EVENT_ID
+from database import async_session_maker
+from http_client import sms_breaker
+from notifications.models import SmsOutbox
+from notifications.schemas import SmsStatus
+from notifications.services import enqueue_sms, sms_dispatcher
+
+
+async def outbox():
+    async with async_session_maker() as session:
+        db_results = await session.execute(
+            select(SmsOutbox).order_by(SmsOutbox.phone_number)
+        )
+        return db_results.scalars().all()
+
+
+async def queue(phone_numbers, message="Hello"):
+    async with async_session_maker() as session:
+        await enqueue_sms(session=session, phone_numbers=phone_numbers, message=message)
+        await session.commit()
+
+
+def rsvp(client, email, phone_number="0244000001"):
+    return client.post(
+        f"/users/event/{EVENT_ID}",
+        json={"email": email, "first_name": "Ama", "phone_number": phone_number},
+    )
+
+
+def test_rsvp_queues_one_sms_with_the_attendee(sms_client):
+    assert rsvp(sms_client, "ama@example.com").status_code == 200
+    assert rsvp(sms_client, "ama@example.com").status_code == 200
+
+    messages = sms_client.portal.call(outbox)
+    assert [message.phone_number for message in messages] == ["0244000001"]
+    assert messages[0].status == SmsStatus.pending.value
+
+
+def test_rsvp_is_not_stored_without_its_sms(sms_client, monkeypatch):
+    async def failing_enqueue(**kwargs):
+        raise OperationalError("INSERT INTO sms_outbox", {}, Exception("disk full"))
+
+    monkeypatch.setattr(attendance_services, "enqueue_sms", failing_enqueue)
+    assert rsvp(sms_client, "ama@example.com").status_code == 500
+
+    assert sms_client.get(f"/attendance/{EVENT_ID}").json()["total"] == 0
+    assert sms_client.portal.call(outbox) == []
+
+
+def test_dispatch_dedupes_and_chunks_recipients(sms_client, fake_arkesel, monkeypatch):
+    monkeypatch.setattr(sms_dispatcher, "recipient_limit", 100)
+    numbers = [f"0244{index:06d}" for index in range(250)]
+    sms_client.portal.call(queue, numbers + numbers[:10] + [None])
+
+    sms_client.portal.call(sms_dispatcher.dispatch)
+
+    assert sorted(len(chunk) for chunk in fake_arkesel.recipients) == [50, 100, 100]
+    sent = sorted(number for chunk in fake_arkesel.recipients for number in chunk)
+    assert sent == sorted(numbers)
+    messages = sms_client.portal.call(outbox)
+    assert {message.status for message in messages} == {SmsStatus.sent.value}
+    assert all(message.provider_message_id for message in messages)
+
+
+def test_failed_send_is_retried_with_backoff(sms_client, fake_arkesel):
+    fake_arkesel.failures = [500]
+    sms_client.portal.call(queue, ["0244000001"])
+
+    sms_client.portal.call(sms_dispatcher.dispatch)
+
+    [message] = sms_client.portal.call(outbox)
+    assert message.status == SmsStatus.pending.value
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.utcnow()
+    assert message.last_error
+
+
+def test_refused_chunks_stay_pending_without_an_attempt(
+    sms_client, fake_arkesel, monkeypatch
+):
+    monkeypatch.setattr(sms_dispatcher, "recipient_limit", 1)
+    sms_client.portal.call(queue, ["0244000001", "0244000002"])
+    # Half open: the first chunk is the trial and the second one is refused.
+    sms_breaker.failures = sms_breaker.failure_threshold
+    sms_breaker.opened_at = time.monotonic() - sms_breaker.reset_timeout - 1
+
+    sms_client.portal.call(sms_dispatcher.dispatch)
+
+    messages = sms_client.portal.call(outbox)
+    assert sorted((message.status, message.attempts) for message in messages) == [
+        (SmsStatus.pending.value, 0),
+        (SmsStatus.sent.value, 1),
+    ]
+    assert len(fake_arkesel.requests) == 1